@@ -2,6 +2,7 @@
 from __future__ import annotations
 
 import argparse
+import csv
 import json
 import re
 from dataclasses import asdict
@@ -16,7 +17,7 @@ import sys
 sys.path.append(str(Path(__file__).resolve().parents[1] / "src"))
 
 from santa2025.geometry import build_tree_polygon
-from santa2025.io import TreePlacement, groups_from_submission, write_submission_csv
+from santa2025.io import TreePlacement, groups_from_submission
 from santa2025.metric import ParticipantVisibleError, score_detailed
 from santa2025.scoring import per_group_dataframe
 from santa2025.solver.local_search import LocalSearchConfig, LocalSearchRefiner
@@ -67,6 +68,10 @@ def _round_placements(
     ]
 
 
+def _placement_signature(placements: List[TreePlacement]) -> Tuple[Tuple[float, float, float], ...]:
+    return tuple((p.x, p.y, p.deg) for p in placements)
+
+
 def _has_overlap(placements: List[TreePlacement], scale_factor: float) -> bool:
     if len(placements) <= 1:
         return False
@@ -91,32 +96,45 @@ def _has_overlap(placements: List[TreePlacement], scale_factor: float) -> bool:
     return False
 
 
-def _build_group_frame(
+SubmissionRow = Tuple[str, str, str, str]
+SUBMISSION_COLUMNS = ["id", "x", "y", "deg"]
+
+
+def _build_group_rows(
     n: int,
     placements: List[TreePlacement],
     decimals: int,
-) -> pd.DataFrame:
-    rows = []
-    for idx, placement in enumerate(placements):
-        rows.append(
-            {
-                "id": f"{n:03d}_{idx}",
-                "x": f"s{placement.x:.{decimals}f}",
-                "y": f"s{placement.y:.{decimals}f}",
-                "deg": f"s{placement.deg:.{decimals}f}",
-            }
+) -> List[SubmissionRow]:
+    return [
+        (
+            f"{n:03d}_{idx}",
+            f"s{placement.x:.{decimals}f}",
+            f"s{placement.y:.{decimals}f}",
+            f"s{placement.deg:.{decimals}f}",
         )
-    return pd.DataFrame(rows, columns=["id", "x", "y", "deg"])
+        for idx, placement in enumerate(placements)
+    ]
 
 
-def _combine_frames(frames: Dict[int, pd.DataFrame]) -> pd.DataFrame:
-    combined = pd.concat(frames.values(), ignore_index=True)
-    combined["group"] = combined["id"].astype(str).str.split("_").str[0].astype(int)
-    combined["item"] = combined["id"].astype(str).str.split("_").str[1].astype(int)
-    combined = combined.sort_values(["group", "item"]).drop(columns=["group", "item"])
+def _combine_rows(frames: Dict[int, List[SubmissionRow]]) -> List[SubmissionRow]:
+    combined: List[SubmissionRow] = []
+    for n in sorted(frames.keys()):
+        combined.extend(sorted(frames[n], key=lambda row: int(row[0].split("_")[1])))
     return combined
 
 
+def _write_rows(rows: List[SubmissionRow], path: Path) -> None:
+    path.parent.mkdir(parents=True, exist_ok=True)
+    with path.open("w", newline="") as f:
+        writer = csv.writer(f, lineterminator="\n")
+        writer.writerow(SUBMISSION_COLUMNS)
+        writer.writerows(rows)
+
+
+def _score_rows(rows: List[SubmissionRow]) -> Tuple[float, Dict[int, float]]:
+    return score_detailed(pd.DataFrame(rows, columns=SUBMISSION_COLUMNS))
+
+
 def main() -> None:
     parser = argparse.ArgumentParser()
     parser.add_argument("--submission", required=True)
@@ -138,12 +156,15 @@ def main() -> None:
     parser.add_argument("--bounds", type=float, default=100.0)
     parser.add_argument("--log-every-steps", type=int, default=10000)
     parser.add_argument("--max-workers", type=int, default=4)
+    parser.add_argument("--restart-workers", type=int, default=1)
+    parser.add_argument("--angle-quantum", type=float, default=0.0)
     args = parser.parse_args()
 
     df = pd.read_csv(args.submission)
     df["group"] = df["id"].astype(str).str.split("_").str[0].astype(int)
-    orig_frames: Dict[int, pd.DataFrame] = {
-        n: grp[["id", "x", "y", "deg"]].copy() for n, grp in df.groupby("group")
+    orig_frames: Dict[int, List[SubmissionRow]] = {
+        int(n): list(grp[SUBMISSION_COLUMNS].astype(str).itertuples(index=False, name=None))
+        for n, grp in df.groupby("group")
     }
     groups = groups_from_submission(df)
     targets = _parse_target_ns(args.n_list)
@@ -164,8 +185,13 @@ def main() -> None:
         scale_factor=args.scale_factor,
         bounds=args.bounds,
         log_every_steps=args.log_every_steps,
+        restart_workers=args.restart_workers,
+        angle_quantum=args.angle_quantum,
     )
 
+    orig_signatures = {
+        n: _placement_signature(_round_placements(groups[n], args.decimals)) for n in targets
+    }
     tasks = [(n, groups[n], asdict(ls_config), args.seed + n) for n in targets]
     results: List[Tuple[int, List[TreePlacement], float]] = []
     if args.max_workers > 1:
@@ -180,29 +206,32 @@ def main() -> None:
         groups[n] = refined
 
     overlap_groups: List[int] = []
-    refined_frames: Dict[int, pd.DataFrame] = {}
+    refined_frames: Dict[int, List[SubmissionRow]] = {}
     for n in targets:
         rounded = _round_placements(groups[n], args.decimals)
+        if _placement_signature(rounded) == orig_signatures[n]:
+            # Unchanged by the refiner: keep the original rows, no overlap check needed.
+            continue
         if _has_overlap(rounded, ls_config.scale_factor):
             print(f"overlap after rounding in group {n:03d}; reverting", flush=True)
             overlap_groups.append(n)
             continue
-        refined_frames[n] = _build_group_frame(n, rounded, args.decimals)
+        refined_frames[n] = _build_group_rows(n, rounded, args.decimals)
 
-    final_frames: Dict[int, pd.DataFrame] = {}
+    final_frames: Dict[int, List[SubmissionRow]] = {}
     for n in sorted(orig_frames.keys()):
         if n in refined_frames:
             final_frames[n] = refined_frames[n]
         else:
             final_frames[n] = orig_frames[n]
 
-    submission = _combine_frames(final_frames)
-    write_submission_csv(submission, Path(args.out))
+    submission = _combine_rows(final_frames)
+    _write_rows(submission, Path(args.out))
 
     reverted_after_score: List[int] = []
     while True:
         try:
-            total_score, per_group = score_detailed(submission)
+            total_score, per_group = _score_rows(submission)
             break
         except ParticipantVisibleError as exc:
             msg = str(exc)
@@ -210,9 +239,9 @@ def main() -> None:
             match = re.search(r"group (\d+)", msg)
             if not match:
                 print("reverting all refined groups due to unknown overlap", flush=True)
-                submission = _combine_frames(orig_frames)
-                write_submission_csv(submission, Path(args.out))
-                total_score, per_group = score_detailed(submission)
+                submission = _combine_rows(orig_frames)
+                _write_rows(submission, Path(args.out))
+                total_score, per_group = _score_rows(submission)
                 reverted_after_score = targets[:]
                 break
             group_id = int(match.group(1))
@@ -221,16 +250,16 @@ def main() -> None:
                 final_frames[group_id] = orig_frames[group_id]
                 refined_frames.pop(group_id, None)
                 reverted_after_score.append(group_id)
-                submission = _combine_frames(final_frames)
-                write_submission_csv(submission, Path(args.out))
+                submission = _combine_rows(final_frames)
+                _write_rows(submission, Path(args.out))
                 continue
             print(
                 f"overlap in non-refined group {group_id:03d}; reverting all refined groups",
                 flush=True,
             )
-            submission = _combine_frames(orig_frames)
-            write_submission_csv(submission, Path(args.out))
-            total_score, per_group = score_detailed(submission)
+            submission = _combine_rows(orig_frames)
+            _write_rows(submission, Path(args.out))
+            total_score, per_group = _score_rows(submission)
             reverted_after_score = targets[:]
             break
 
@@ -10,6 +10,7 @@ from pathlib import Path
 from typing import Dict, List
 
 import numpy as np
+import pandas as pd
 
 import sys
 
@@ -179,6 +180,10 @@ def _has_overlap(placements: List[TreePlacement], scale_factor: float = 1e18) ->
     return False
 
 
+def _combine_frames(frames: Dict[int, pd.DataFrame]) -> pd.DataFrame:
+    return pd.concat([frames[n] for n in sorted(frames)], ignore_index=True)
+
+
 def main() -> None:
     parser = argparse.ArgumentParser()
     parser.add_argument("--submission", required=True)
@@ -207,14 +212,18 @@ def main() -> None:
         placements = groups[n]
         points = _build_group_points(placements)
         base_side = _bounding_side(points)
-        best_angle, best_side = _search_best_angle(
-            points,
+        # The angle sweep only compares sides, so float32 is precise enough and
+        # halves the memory traffic; the chosen angle is re-evaluated in float64.
+        search_points = points.astype(np.float32)
+        best_angle, _ = _search_best_angle(
+            search_points,
             args.coarse_step,
             args.refine_step,
             args.fine_step,
             args.refine_radius,
             args.fine_radius,
         )
+        best_side = _bounding_side(_rotated_points(points, best_angle))
         base_score = (base_side * base_side) / float(n)
         best_score = (best_side * best_side) / float(n)
         improvement = base_score - best_score
@@ -237,7 +246,12 @@ def main() -> None:
             else:
                 groups[n] = rounded
 
-    submission = build_submission(groups, decimals=args.decimals)
+    # Per-group frames, so a revert in the retry loop only rebuilds that group.
+    frame_cache: Dict[int, pd.DataFrame] = {
+        n: build_submission({n: placements}, decimals=args.decimals)
+        for n, placements in groups.items()
+    }
+    submission = _combine_frames(frame_cache)
 
     total_score = float("inf")
     while True:
@@ -250,10 +264,13 @@ def main() -> None:
             if not match:
                 break
             group_id = int(match.group(1))
-            if group_id in orig_groups:
+            if group_id in orig_groups and group_id not in reverted:
                 groups[group_id] = orig_groups[group_id]
                 reverted.append(group_id)
-                submission = build_submission(groups, decimals=args.decimals)
+                frame_cache[group_id] = build_submission(
+                    {group_id: orig_groups[group_id]}, decimals=args.decimals
+                )
+                submission = _combine_frames(frame_cache)
                 continue
             break
 
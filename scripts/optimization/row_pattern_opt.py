@@ -3,6 +3,7 @@ from __future__ import annotations
 
 import argparse
 import json
+import math
 import random
 from pathlib import Path
 from typing import Iterable, List, Tuple
@@ -15,6 +16,10 @@ from santa2025.io import build_submission, write_submission_csv
 from santa2025.metric import score_detailed
 from santa2025.solver.row_pattern import RowPatternConfig, RowPatternSolver, RowPatternSpec
 
+WARMUP_ROUNDS = 4
+WARMUP_PROPOSALS = 8
+WARMUP_TARGET = 0.3
+
 
 def _parse_range(value: str) -> Tuple[float, float]:
     parts = [p.strip() for p in value.split(",") if p.strip()]
@@ -32,12 +37,7 @@ def _score_candidate(
     spec: RowPatternSpec,
     n_list: Iterable[int],
 ) -> float:
-    total = 0.0
-    for n in n_list:
-        layout = solver.best_layout(n, spec)
-        score, _ = solver._score_and_bounds(layout)
-        total += score
-    return total
+    return solver.score_spec(spec, n_list)
 
 
 def _clamp(value: float, low: float, high: float) -> float:
@@ -56,7 +56,8 @@ def _refine(
     offset_max: float,
     rng: random.Random,
     steps: int,
-    decay: float,
+    band_len: int,
+    band_decay: float,
     step_dx_scale: float,
     step_dy_scale: float,
     step_off_scale: float,
@@ -65,26 +66,53 @@ def _refine(
     best_score = _score_candidate(solver, spec, n_list)
     step_dx = (dx_max - dx_min) * step_dx_scale
     step_dy = (dy_max - dy_min) * step_dy_scale
+    step_off = step_off_scale
     period = len(spec.angles)
 
-    for i in range(steps):
-        scale = decay**i
-        ndx = _clamp(best.dx + rng.uniform(-1.0, 1.0) * step_dx * scale, dx_min, dx_max)
-        ndy = _clamp(best.dy + rng.uniform(-1.0, 1.0) * step_dy * scale, dy_min, dy_max)
+    def _propose(base: RowPatternSpec, scale: float) -> RowPatternSpec:
+        ndx = _clamp(base.dx + rng.uniform(-1.0, 1.0) * step_dx * scale, dx_min, dx_max)
+        ndy = _clamp(base.dy + rng.uniform(-1.0, 1.0) * step_dy * scale, dy_min, dy_max)
         offsets = []
-        for off in best.offsets:
-            offsets.append(_clamp(off + rng.uniform(-1.0, 1.0) * step_off_scale * scale, offset_min, offset_max))
+        for off in base.offsets:
+            offsets.append(_clamp(off + rng.uniform(-1.0, 1.0) * step_off * scale, offset_min, offset_max))
         if len(offsets) != period:
             offsets = offsets[:period]
-        candidate = RowPatternSpec(
-            angles=best.angles,
+        return RowPatternSpec(
+            angles=base.angles,
             offsets=offsets,
             dx=ndx,
             dy=ndy,
         )
-        if solver._grid_collision(candidate):
+
+    # Warm-up: the input spec is already tight, so full-size steps mostly
+    # collide or get worse. Halve the step scale until about WARMUP_TARGET of
+    # the proposals improve; the CLI step scales act as ceilings.
+    warm_scale = 1.0
+    for _ in range(WARMUP_ROUNDS):
+        accepted = 0
+        for _ in range(WARMUP_PROPOSALS):
+            candidate = _propose(best, warm_scale)
+            score = solver.score_if_valid(candidate, n_list)
+            if score is not None and score < best_score:
+                best_score = score
+                best = candidate
+                accepted += 1
+        if accepted >= WARMUP_TARGET * WARMUP_PROPOSALS:
+            break
+        warm_scale *= 0.5
+    step_dx *= warm_scale
+    step_dy *= warm_scale
+    step_off *= warm_scale
+
+    # Repeated cosine bands (hot -> cold) with a decaying envelope, so dx, dy
+    # and the offsets all get wide and narrow proposals throughout the run.
+    for i in range(steps):
+        band_phase = 2.0 * math.pi * (i % band_len) / band_len
+        scale = 0.5 * (1.0 + math.cos(band_phase)) * band_decay ** (i // band_len)
+        candidate = _propose(best, scale)
+        score = solver.score_if_valid(candidate, n_list)
+        if score is None:
             continue
-        score = _score_candidate(solver, candidate, n_list)
         if score < best_score:
             best_score = score
             best = candidate
@@ -112,11 +140,19 @@ def main() -> None:
     parser.add_argument("--squeeze-factor", type=float, default=0.985)
     parser.add_argument("--squeeze-steps", type=int, default=20)
     parser.add_argument("--squeeze-iters", type=int, default=8)
+    parser.add_argument("--bisect-tol", type=float, default=1e-9)
     parser.add_argument("--selection-mode", default="square_search")
     parser.add_argument("--center-steps", type=int, default=6)
     parser.add_argument("--search-pad", type=int, default=3)
     parser.add_argument("--refine-steps", type=int, default=120)
     parser.add_argument("--refine-decay", type=float, default=0.985)
+    parser.add_argument("--refine-band-len", type=int, default=0, help="0 = max(10, steps // 8)")
+    parser.add_argument(
+        "--refine-band-decay",
+        type=float,
+        default=None,
+        help="Envelope decay per band (default: refine-decay ** band-len)",
+    )
     parser.add_argument("--refine-dx-scale", type=float, default=0.10)
     parser.add_argument("--refine-dy-scale", type=float, default=0.10)
     parser.add_argument("--refine-offset-scale", type=float, default=0.12)
@@ -128,6 +164,10 @@ def main() -> None:
     dy_min, dy_max = _parse_range(args.dy_range)
     off_min, off_max = _parse_range(args.offset_range)
     score_n_list = [int(x.strip()) for x in args.score_n_list.split(",") if x.strip()]
+    band_len = args.refine_band_len or max(10, args.refine_steps // 8)
+    band_decay = args.refine_band_decay
+    if band_decay is None:
+        band_decay = args.refine_decay**band_len
 
     cfg = RowPatternConfig(
         period=period,
@@ -139,6 +179,7 @@ def main() -> None:
         squeeze_factor=args.squeeze_factor,
         squeeze_steps=args.squeeze_steps,
         squeeze_iters=args.squeeze_iters,
+        bisect_tol=args.bisect_tol,
     )
     solver = RowPatternSolver(cfg)
     rng = random.Random(args.seed)
@@ -190,10 +231,10 @@ def main() -> None:
 
         dy = _clamp(min_dy * rng.uniform(1.0, 1.15), dy_min, dy_max)
         spec = RowPatternSpec(angles=angles, offsets=offsets, dx=dx, dy=dy)
-        if solver._grid_collision(spec):
+        proxy = solver.score_if_valid(spec, score_n_list)
+        if proxy is None:
             continue
 
-        proxy = _score_candidate(solver, spec, score_n_list)
         record = {
             "angles": angles,
             "offsets": offsets,
@@ -226,7 +267,8 @@ def main() -> None:
                 off_max,
                 rng,
                 args.refine_steps,
-                args.refine_decay,
+                band_len,
+                band_decay,
                 args.refine_dx_scale,
                 args.refine_dy_scale,
                 args.refine_offset_scale,
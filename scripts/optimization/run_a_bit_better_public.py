@@ -2,21 +2,33 @@
 from __future__ import annotations
 
 import argparse
+import hashlib
 import json
 import os
+import shutil
 import subprocess
+import threading
 import time
+from concurrent.futures import ThreadPoolExecutor, as_completed
 from pathlib import Path
 from typing import List
 
 import pandas as pd
 
+try:
+    import pyarrow  # noqa: F401
+    PYARROW_AVAILABLE = True
+except ImportError:
+    PYARROW_AVAILABLE = False
+
 import sys
 
 sys.path.append(str(Path(__file__).resolve().parents[1] / "src"))
 
 from santa2025.metric import ParticipantVisibleError, score_detailed
 
+CPP_FLAGS = ["-O3", "-march=native", "-flto=auto", "-funroll-loops", "-fno-plt", "-std=c++17"]
+
 
 def _parse_target_ns(value: str | None) -> List[int] | None:
     if value is None:
@@ -36,35 +48,110 @@ def _parse_target_ns(value: str | None) -> List[int] | None:
     return sorted(set(targets))
 
 
-def _score_submission(path: Path) -> tuple[float, dict[int, float]]:
-    df = pd.read_csv(path)
-    return score_detailed(df)
+def _read_submission(path: Path) -> pd.DataFrame:
+    # Values stay strings so the 's'-prefixed coordinates round-trip exactly.
+    if PYARROW_AVAILABLE:
+        return pd.read_csv(path, dtype=str, engine="pyarrow")
+    return pd.read_csv(path, dtype=str)
 
 
-def _compile_cpp(cpp_path: Path, bin_path: Path) -> None:
-    base_cmd = [
-        "g++",
-        "-O3",
-        "-march=native",
-        "-std=c++17",
-        "-o",
-        str(bin_path),
-        str(cpp_path),
-    ]
+def _compile_cpp(cpp_path: Path, bin_path: Path, extra_flags: List[str] | None = None) -> bool:
+    # Returns whether the binary was built with OpenMP.
+    flags = [*CPP_FLAGS, *(extra_flags or [])]
+    base_cmd = ["g++", *flags, "-o", str(bin_path), str(cpp_path)]
     try:
-        cmd = [
-            "g++",
-            "-O3",
-            "-march=native",
-            "-std=c++17",
-            "-fopenmp",
-            "-o",
-            str(bin_path),
-            str(cpp_path),
-        ]
+        cmd = ["g++", *flags, "-fopenmp", "-o", str(bin_path), str(cpp_path)]
         subprocess.run(cmd, check=True)
+        return True
     except subprocess.CalledProcessError:
         subprocess.run(base_cmd, check=True)
+        return False
+
+
+def _compile_cpp_pgo(
+    cpp_path: Path,
+    bin_path: Path,
+    work_dir: Path,
+    train_csv: Path,
+    train_group: int,
+    timeout: int,
+) -> bool:
+    # Two-pass PGO: instrumented build, one short training run, optimized rebuild.
+    pgo_dir = work_dir / "pgo"
+    shutil.rmtree(pgo_dir, ignore_errors=True)
+    # Both passes must write the same output name: GCC keys .gcda files on it.
+    _compile_cpp(cpp_path, bin_path, [f"-fprofile-generate={pgo_dir}"])
+    env = os.environ.copy()
+    env["GROUP_NUMBER"] = str(train_group)
+    train_out = work_dir / "submission_pgo.csv"
+    cmd = [str(bin_path), "-i", str(train_csv), "-o", str(train_out), "-n", "2000", "-r", "8"]
+    try:
+        subprocess.run(cmd, env=env, capture_output=True, timeout=timeout, check=True)
+    except (subprocess.TimeoutExpired, subprocess.CalledProcessError) as exc:
+        print(f"pgo training run failed ({exc}); using partial profile", flush=True)
+    train_out.unlink(missing_ok=True)
+    return _compile_cpp(cpp_path, bin_path, [f"-fprofile-use={pgo_dir}", "-fprofile-correction"])
+
+
+def _binary_flags(openmp: bool) -> List[str]:
+    return [*CPP_FLAGS, "-fopenmp"] if openmp else list(CPP_FLAGS)
+
+
+def _binary_key(cpp_path: Path, pgo: bool, openmp: bool) -> str:
+    flags = " ".join(_binary_flags(openmp) + (["pgo"] if pgo else [])).encode()
+    return hashlib.sha1(cpp_path.read_bytes() + b"|" + flags).hexdigest()[:12]
+
+
+def _record_binary(
+    work_dir: Path, key: str, cpp_path: Path, bin_path: Path, pgo: bool, openmp: bool
+) -> None:
+    index_path = work_dir / "bin_index.json"
+    try:
+        index = json.loads(index_path.read_text())
+    except (OSError, ValueError):
+        index = {}
+    index[key] = {
+        "cpp": str(cpp_path),
+        "bin": str(bin_path),
+        "flags": _binary_flags(openmp),
+        "pgo": pgo,
+    }
+    index_path.write_text(json.dumps(index, indent=2))
+
+
+def _build_binary(
+    args: argparse.Namespace,
+    cpp_path: Path,
+    work_dir: Path,
+    train_csv: Path,
+    train_group: int,
+) -> Path:
+    # Binaries are keyed by source + the flags they were actually built with,
+    # so editing the .cpp never reuses a stale build and a PGO run never picks
+    # up a plain one. A build without OpenMP (the compiler lacked it) is only
+    # reused when there is no OpenMP build.
+    if not args.recompile:
+        for openmp in (True, False):
+            key = _binary_key(cpp_path, args.pgo, openmp)
+            bin_path = work_dir / f"single_group_optimizer_{key}"
+            if bin_path.exists():
+                return bin_path
+
+    build_path = work_dir / "single_group_optimizer_build"
+    if args.pgo:
+        openmp = _compile_cpp_pgo(cpp_path, build_path, work_dir, train_csv, train_group, args.timeout)
+    else:
+        openmp = _compile_cpp(cpp_path, build_path)
+    key = _binary_key(cpp_path, args.pgo, openmp)
+    bin_path = work_dir / f"single_group_optimizer_{key}"
+    build_path.replace(bin_path)
+    _record_binary(work_dir, key, cpp_path, bin_path, args.pgo, openmp)
+    return bin_path
+
+
+def _improved_rows(improved_csv: Path, n: int) -> pd.DataFrame:
+    df_new = _read_submission(improved_csv)
+    return df_new[df_new["id"].str.startswith(f"{n:03d}_")].reset_index(drop=True)
 
 
 def main() -> None:
@@ -82,6 +169,17 @@ def main() -> None:
     parser.add_argument("--max-minutes", type=int, default=0, help="Stop after N minutes (0 = no limit)")
     parser.add_argument("--cpp", default="scripts/single_group_optimizer.cpp")
     parser.add_argument("--recompile", action="store_true")
+    parser.add_argument(
+        "--pgo",
+        action="store_true",
+        help="Build with profile-guided optimization, trained on the first target group",
+    )
+    parser.add_argument(
+        "--workers",
+        type=int,
+        default=max(1, (os.cpu_count() or 1) // 2),
+        help="Groups optimized concurrently (each gets cpu_count // workers OpenMP threads)",
+    )
     args = parser.parse_args()
 
     repo_root = Path(__file__).resolve().parents[1]
@@ -90,18 +188,14 @@ def main() -> None:
 
     input_path = Path(args.submission).resolve()
     working_csv = work_dir / "submission.csv"
-    temp_csv = work_dir / "submission_temp.csv"
     output_path = Path(args.out).resolve()
 
     cpp_path = (repo_root / args.cpp).resolve()
-    bin_path = work_dir / "single_group_optimizer"
-
-    if args.recompile or not bin_path.exists():
-        _compile_cpp(cpp_path, bin_path)
-
-    subprocess.run(["cp", str(input_path), str(working_csv)], check=True)
+    shutil.copyfile(input_path, working_csv)
 
-    base_score, per_group = _score_submission(working_csv)
+    df = _read_submission(working_csv)
+    base_score, per_group = score_detailed(df)
+    df = df.set_index("id")
     print(f"base_score: {base_score}", flush=True)
 
     targets = _parse_target_ns(args.groups)
@@ -109,13 +203,27 @@ def main() -> None:
         filtered = {n: s for n, s in per_group.items() if args.min_n <= n <= args.max_n}
         targets = [n for n, _ in sorted(filtered.items(), key=lambda x: x[1], reverse=True)[: args.top_k]]
 
+    # Nothing to optimize means nothing to build (and no group to train PGO on).
+    if targets:
+        bin_path = _build_binary(args, cpp_path, work_dir, working_csv, targets[0])
+
+    # Every job only rewrites its own group, so all jobs read the unchanged
+    # working_csv; improved groups are spliced into the in-memory frame and
+    # only that group is re-scored.
+    workers = max(1, min(args.workers, len(targets)))
+    base_env = os.environ.copy()
+    if workers > 1:
+        base_env.setdefault("OMP_NUM_THREADS", str(max(1, (os.cpu_count() or 1) // workers)))
+
     start_time = time.time()
-    improved_groups: List[int] = []
-    for n in targets:
+
+    def _run_group(n: int) -> tuple[int, Path | None, str]:
         if args.max_minutes > 0 and (time.time() - start_time) > args.max_minutes * 60:
-            break
-        env = os.environ.copy()
-        env["GROUP_NUMBER"] = str(n)
+            return n, None, ""
+        temp_csv = work_dir / f"submission_temp_{n}.csv"
+        temp_csv.unlink(missing_ok=True)
+        # Jobs run concurrently, so each gets its own shallow overlay of base_env.
+        env = {**base_env, "GROUP_NUMBER": str(n)}
         cmd = [
             str(bin_path),
             "-i",
@@ -127,34 +235,65 @@ def main() -> None:
             "-r",
             str(args.restarts),
         ]
-        try:
-            result = subprocess.run(
-                cmd,
-                env=env,
-                capture_output=True,
-                text=True,
-                timeout=args.timeout,
-                check=True,
-            )
-        except subprocess.TimeoutExpired:
+        # Stream the log and keep only the improvement marker line.  An absolute
+        # binary path with close_fds=False and no cwd/preexec_fn keeps CPython on
+        # its posix_spawn path instead of fork+exec; our own fds are already
+        # non-inheritable (PEP 446), so nothing extra leaks into the child.
+        improved_line = ""
+        with subprocess.Popen(
+            cmd,
+            env=env,
+            stdin=subprocess.DEVNULL,
+            stdout=subprocess.PIPE,
+            stderr=subprocess.STDOUT,
+            close_fds=False,
+            bufsize=1,
+            text=True,
+        ) as proc:
+            timer = threading.Timer(args.timeout, proc.kill)
+            timer.start()
+            try:
+                for line in proc.stdout:
+                    if ">>> IMPROVED" in line:
+                        improved_line = line.strip()
+                returncode = proc.wait()
+            finally:
+                timed_out = not timer.is_alive()
+                timer.cancel()
+        if timed_out:
             print(f"group {n}: timeout", flush=True)
-            continue
-        except subprocess.CalledProcessError as exc:
-            print(f"group {n}: error {exc}", flush=True)
-            continue
+            return n, None, ""
+        if returncode != 0:
+            print(f"group {n}: error exit status {returncode}", flush=True)
+            return n, None, ""
+        if improved_line and temp_csv.exists():
+            return n, temp_csv, improved_line
+        return n, None, ""
 
-        if ">>> IMPROVED" in result.stdout and temp_csv.exists():
-            temp_csv.replace(working_csv)
+    improved_groups: List[int] = []
+    with ThreadPoolExecutor(max_workers=workers) as executor:
+        futures = [executor.submit(_run_group, n) for n in targets]
+        for future in as_completed(futures):
+            n, improved_csv, improved_line = future.result()
+            if improved_csv is None:
+                continue
+            rows = _improved_rows(improved_csv, n)
+            improved_csv.unlink()
+            try:
+                _, group_scores = score_detailed(rows)
+            except ParticipantVisibleError as exc:
+                print(f"group {n}: rejected improvement ({exc})", flush=True)
+                continue
+            df.loc[rows["id"]] = rows.set_index("id")
+            per_group[n] = group_scores[n]
             improved_groups.append(n)
-            print(result.stdout.strip().splitlines()[-1], flush=True)
+            print(improved_line, flush=True)
 
-    try:
-        final_score, _ = _score_submission(working_csv)
-    except ParticipantVisibleError as exc:
-        raise SystemExit(f"Invalid submission after optimization: {exc}") from exc
+    final_score = sum(per_group.values())
+    df.reset_index().to_csv(working_csv, index=False)
 
     output_path.parent.mkdir(parents=True, exist_ok=True)
-    subprocess.run(["cp", str(working_csv), str(output_path)], check=True)
+    shutil.copyfile(working_csv, output_path)
     print(f"final_score: {final_score}", flush=True)
 
     summary = {
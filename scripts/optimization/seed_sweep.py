@@ -3,6 +3,8 @@ from __future__ import annotations
 
 import argparse
 import copy
+import os
+from concurrent.futures import ProcessPoolExecutor
 from pathlib import Path
 
 import sys
@@ -12,21 +14,53 @@ sys.path.append(str(Path(__file__).resolve().parents[1] / "src"))
 from santa2025.pipeline import load_config, run_experiment
 
 
+def _cap_workers(section: dict, limit: int, default: int) -> None:
+    # 0 means "all CPUs" to the solvers, so it counts as over the limit.
+    current = int(section.get("max_workers", default))
+    if current <= 0 or current > limit:
+        section["max_workers"] = limit
+
+
 def main() -> None:
     parser = argparse.ArgumentParser()
     parser.add_argument("--config", required=True)
     parser.add_argument("--seeds", required=True, help="Comma-separated seeds")
     parser.add_argument("--output-dir", required=True)
+    parser.add_argument(
+        "--max-workers",
+        type=int,
+        default=0,
+        help="Seeds run concurrently (0 = min(len(seeds), cpu_count))",
+    )
     args = parser.parse_args()
 
     base_config = load_config(Path(args.config))
     seeds = [int(s.strip()) for s in args.seeds.split(",") if s.strip()]
     output_dir = Path(args.output_dir)
 
+    cpu_count = os.cpu_count() or 1
+    max_workers = args.max_workers or min(len(seeds), cpu_count)
+    # Each run may start its own solver pools; split the CPUs between the
+    # concurrent seeds instead of letting every run claim all of them.
+    inner_workers = max(1, cpu_count // max_workers)
+    configs = []
     for seed in seeds:
         config = copy.deepcopy(base_config)
         config["seed"] = seed
-        run_experiment(config, output_dir / f"exp_seed_{seed}")
+        if max_workers > 1:
+            _cap_workers(config.setdefault("baseline", {}), inner_workers, default=0)
+            if "refine" in config:
+                _cap_workers(config["refine"], inner_workers, default=1)
+        configs.append((config, output_dir / f"exp_seed_{seed}"))
+
+    if max_workers > 1:
+        with ProcessPoolExecutor(max_workers=max_workers) as executor:
+            futures = [executor.submit(run_experiment, config, out) for config, out in configs]
+            for future in futures:
+                future.result()
+    else:
+        for config, out in configs:
+            run_experiment(config, out)
 
 
 if __name__ == "__main__":
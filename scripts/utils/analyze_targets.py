@@ -6,6 +6,12 @@ from pathlib import Path
 
 import pandas as pd
 
+try:
+    import pyarrow  # noqa: F401
+    PYARROW_AVAILABLE = True
+except ImportError:
+    PYARROW_AVAILABLE = False
+
 
 def main() -> None:
     parser = argparse.ArgumentParser()
@@ -14,8 +20,9 @@ def main() -> None:
     parser.add_argument("--out", required=True)
     args = parser.parse_args()
 
-    df = pd.read_csv(args.per_n).sort_values("group_score", ascending=False)
-    targets = df.head(args.top_k)["n"].tolist()
+    engine = "pyarrow" if PYARROW_AVAILABLE else None
+    df = pd.read_csv(args.per_n, usecols=["n", "group_score"], engine=engine)
+    targets = df.nlargest(args.top_k, "group_score")["n"].tolist()
     Path(args.out).parent.mkdir(parents=True, exist_ok=True)
     Path(args.out).write_text("\n".join(str(n) for n in targets))
 
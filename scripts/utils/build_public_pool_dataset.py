@@ -4,13 +4,29 @@ from __future__ import annotations
 import argparse
 import csv
 import json
+import os
 import re
 import shutil
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
-from typing import Iterable, List
+from typing import Dict, Iterable, Iterator, List
 
+try:
+    import orjson
+    ORJSON_AVAILABLE = True
+except ImportError:
+    ORJSON_AVAILABLE = False
 
 REQUIRED_COLUMNS = {"id", "x", "y", "deg"}
+HEADER_MIN_BYTES = len("id,x,y,deg")
+HEADER_READ_BYTES = 4096
+
+
+def _write_json(path: Path, payload: object) -> None:
+    if ORJSON_AVAILABLE:
+        path.write_bytes(orjson.dumps(payload, option=orjson.OPT_INDENT_2))
+    else:
+        path.write_text(json.dumps(payload, indent=2))
 
 
 def _slugify(text: str) -> str:
@@ -18,15 +34,48 @@ def _slugify(text: str) -> str:
     return slug or "submission"
 
 
-def _has_required_header(csv_path: Path) -> bool:
+def _load_header_cache(path: Path) -> Dict[str, bool]:
     try:
-        with csv_path.open("r", newline="") as handle:
-            reader = csv.reader(handle)
-            header = next(reader)
-    except Exception:
+        return json.loads(path.read_text())
+    except (OSError, ValueError):
+        return {}
+
+
+def _has_required_header(csv_path: Path, cache: Dict[str, bool]) -> bool:
+    try:
+        stat = csv_path.stat()
+    except OSError:
         return False
+    if stat.st_size < HEADER_MIN_BYTES:
+        return False
+    key = f"{csv_path}:{stat.st_mtime_ns}:{stat.st_size}"
+    cached = cache.get(key)
+    if cached is not None:
+        return cached
+    try:
+        with csv_path.open("r", newline="", buffering=HEADER_READ_BYTES) as handle:
+            line = handle.readline(HEADER_READ_BYTES)
+        header = next(csv.reader([line]))
+    except Exception:
+        header = []
     normalized = {h.strip().lower() for h in header}
-    return REQUIRED_COLUMNS.issubset(normalized)
+    result = REQUIRED_COLUMNS.issubset(normalized)
+    cache[key] = result
+    return result
+
+
+def _walk_csvs(base: Path) -> Iterator[Path]:
+    try:
+        entries = list(os.scandir(base))
+    except OSError:
+        return
+    for entry in entries:
+        if entry.name.startswith("."):
+            continue
+        if entry.is_dir(follow_symlinks=False):
+            yield from _walk_csvs(Path(entry.path))
+        elif entry.is_file() and entry.name.lower().endswith(".csv"):
+            yield Path(entry.path)
 
 
 def _collect_csvs(paths: Iterable[Path]) -> List[Path]:
@@ -37,10 +86,32 @@ def _collect_csvs(paths: Iterable[Path]) -> List[Path]:
             continue
         if not base.exists():
             continue
-        candidates.extend(p for p in base.rglob("*.csv") if p.is_file())
+        candidates.extend(_walk_csvs(base))
     return candidates
 
 
+def _fast_copy(src: Path, dst: Path) -> None:
+    # copy_file_range lets CoW filesystems (Btrfs, XFS) reflink instead of copying bytes.
+    try:
+        with src.open("rb") as fsrc, dst.open("wb") as fdst:
+            remaining = os.fstat(fsrc.fileno()).st_size
+            while remaining > 0:
+                copied = os.copy_file_range(fsrc.fileno(), fdst.fileno(), remaining)
+                if copied == 0:
+                    break
+                remaining -= copied
+        if remaining > 0:
+            raise OSError("short copy_file_range")
+        shutil.copystat(src, dst)
+    except (AttributeError, OSError):
+        shutil.copy2(src, dst)
+
+
+def _copy_submission(src: Path, target_path: Path) -> None:
+    target_path.parent.mkdir(parents=True, exist_ok=True)
+    _fast_copy(src, target_path)
+
+
 def main() -> None:
     parser = argparse.ArgumentParser()
     parser.add_argument(
@@ -58,6 +129,12 @@ def main() -> None:
         default="public_pool_dataset",
         help="Output directory (relative to repo root).",
     )
+    parser.add_argument(
+        "--workers",
+        type=int,
+        default=16,
+        help="Threads used for header checks and copies.",
+    )
     args = parser.parse_args()
 
     root = Path(__file__).resolve().parents[1]
@@ -75,34 +152,39 @@ def main() -> None:
     submissions_dir = out_dir / "submissions"
     submissions_dir.mkdir(parents=True, exist_ok=True)
 
+    header_cache_path = out_dir / ".header_cache.json"
+    header_cache = _load_header_cache(header_cache_path)
     candidates = _collect_csvs(inputs + includes)
     sources: dict[str, str] = {}
     used: dict[str, int] = {}
-    kept = 0
-
-    for csv_path in candidates:
-        if not _has_required_header(csv_path):
-            continue
-        try:
-            rel = csv_path.resolve().relative_to(root)
-        except ValueError:
-            rel = Path(csv_path.name)
-        slug = _slugify(rel.as_posix().rsplit(".", 1)[0])
-        if slug in used:
-            used[slug] += 1
-            slug = f"{slug}_{used[slug]}"
-        else:
-            used[slug] = 1
-
-        target_dir = submissions_dir / slug
-        target_dir.mkdir(parents=True, exist_ok=True)
-        target_path = target_dir / "submission.csv"
-        shutil.copy2(csv_path, target_path)
-        sources[slug] = str(csv_path)
-        kept += 1
-
+    copies: List[tuple[Path, Path]] = []
+
+    with ThreadPoolExecutor(max_workers=max(1, args.workers)) as executor:
+        valid = list(executor.map(lambda p: _has_required_header(p, header_cache), candidates))
+
+        # Slugs are assigned serially in candidate order so reruns are stable.
+        for csv_path, ok in zip(candidates, valid):
+            if not ok:
+                continue
+            try:
+                rel = csv_path.resolve().relative_to(root)
+            except ValueError:
+                rel = Path(csv_path.name)
+            slug = _slugify(rel.as_posix().rsplit(".", 1)[0])
+            if slug in used:
+                used[slug] += 1
+                slug = f"{slug}_{used[slug]}"
+            else:
+                used[slug] = 1
+            copies.append((csv_path, submissions_dir / slug / "submission.csv"))
+            sources[slug] = str(csv_path)
+
+        list(executor.map(lambda job: _copy_submission(*job), copies))
+    kept = len(copies)
+
+    header_cache_path.write_text(json.dumps(header_cache))
     sources_path = out_dir / "sources.json"
-    sources_path.write_text(json.dumps(sources, indent=2))
+    _write_json(sources_path, sources)
     print(f"Collected {kept} submissions into {out_dir}")
 
 
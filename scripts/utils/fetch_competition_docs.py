@@ -1,44 +1,22 @@
 #!/usr/bin/env python3
 from __future__ import annotations
 
-import json
-import http.cookiejar
 import sys
-import urllib.request
 from pathlib import Path
 
 sys.path.append(str(Path(__file__).resolve().parents[1] / "src"))
 
 from santa2025.constants import COMPETITION_ID, COMPETITION_SLUG
+from santa2025.io import write_json
+from santa2025.kaggle_api import KaggleSession
 
 
 ROOT = Path(__file__).resolve().parents[1]
 DOCS = ROOT / "docs"
 
 
-def _get_session():
-    cj = http.cookiejar.CookieJar()
-    opener = urllib.request.build_opener(urllib.request.HTTPCookieProcessor(cj))
-    opener.open("https://www.kaggle.com").read()
-    xsrf = None
-    for c in cj:
-        if c.name == "XSRF-TOKEN":
-            xsrf = c.value
-            break
-    return opener, xsrf
-
-
-def _api_post(opener, xsrf, path: str, payload: dict) -> dict:
-    body = json.dumps(payload).encode("utf-8")
-    req = urllib.request.Request(path, data=body)
-    req.add_header("Content-Type", "application/json")
-    if xsrf:
-        req.add_header("X-XSRF-TOKEN", xsrf)
-    return json.loads(opener.open(req).read().decode("utf-8"))
-
-
-def _sanitize(text: str) -> str:
-    replacements = {
+_SANITIZE_TABLE = str.maketrans(
+    {
         "\u201c": '"',
         "\u201d": '"',
         "\u2018": "'",
@@ -47,32 +25,28 @@ def _sanitize(text: str) -> str:
         "\u2013": "-",
         "\u00a0": " ",
     }
-    for src, dst in replacements.items():
-        text = text.replace(src, dst)
-    return text.encode("ascii", errors="ignore").decode("ascii")
+)
+
+
+def _sanitize(text: str) -> str:
+    return text.translate(_SANITIZE_TABLE).encode("ascii", errors="ignore").decode("ascii")
 
 
 def main() -> None:
     DOCS.mkdir(parents=True, exist_ok=True)
-    opener, xsrf = _get_session()
+    session = KaggleSession()
 
-    comp = _api_post(
-        opener,
-        xsrf,
+    comp = session.post_json(
         "https://www.kaggle.com/api/i/competitions.CompetitionService/GetCompetition",
         {"competitionName": COMPETITION_SLUG},
     )
 
-    pages = _api_post(
-        opener,
-        xsrf,
+    pages = session.post_json(
         "https://www.kaggle.com/api/i/competitions.PageService/ListPages",
         {"competitionId": COMPETITION_ID},
     )
 
-    (DOCS / "competition_context.json").write_text(
-        json.dumps({"competition": comp, "pages": pages}, indent=2)
-    )
+    write_json(DOCS / "competition_context.json", {"competition": comp, "pages": pages})
 
     page_map = {p["name"]: p["content"] for p in pages.get("pages", [])}
 
@@ -2,36 +2,28 @@
 from __future__ import annotations
 
 import json
-import http.cookiejar
 import sys
-import urllib.request
 from pathlib import Path
 
 sys.path.append(str(Path(__file__).resolve().parents[1] / "src"))
 
 from santa2025.constants import GETTING_STARTED_REF
+from santa2025.kaggle_api import KaggleSession
 
 ROOT = Path(__file__).resolve().parents[1]
 DOCS = ROOT / "docs"
 
 
-def _get_session():
-    cj = http.cookiejar.CookieJar()
-    opener = urllib.request.build_opener(urllib.request.HTTPCookieProcessor(cj))
-    opener.open("https://www.kaggle.com").read()
-    return opener
-
-
 def _sanitize(text: str) -> str:
     return text.encode("ascii", errors="ignore").decode("ascii")
 
 
 def main() -> None:
     DOCS.mkdir(parents=True, exist_ok=True)
-    opener = _get_session()
+    session = KaggleSession()
 
     url = f"https://www.kaggle.com/api/v1/kernels/pull/{GETTING_STARTED_REF}"
-    payload = json.loads(opener.open(url).read().decode("utf-8"))
+    payload = session.get_json(url)
     source = payload["blob"]["source"]
 
     nb = json.loads(source)
@@ -2,41 +2,19 @@
 from __future__ import annotations
 
 import csv
-import json
-import http.cookiejar
 import sys
-import urllib.request
 from pathlib import Path
 
 sys.path.append(str(Path(__file__).resolve().parents[1] / "src"))
 
 from santa2025.constants import COMPETITION_ID
+from santa2025.io import write_json
+from santa2025.kaggle_api import KaggleSession
 
 ROOT = Path(__file__).resolve().parents[1]
 DOCS = ROOT / "docs"
 
 
-def _get_session():
-    cj = http.cookiejar.CookieJar()
-    opener = urllib.request.build_opener(urllib.request.HTTPCookieProcessor(cj))
-    opener.open("https://www.kaggle.com").read()
-    xsrf = None
-    for c in cj:
-        if c.name == "XSRF-TOKEN":
-            xsrf = c.value
-            break
-    return opener, xsrf
-
-
-def _api_post(opener, xsrf, path: str, payload: dict) -> dict:
-    body = json.dumps(payload).encode("utf-8")
-    req = urllib.request.Request(path, data=body)
-    req.add_header("Content-Type", "application/json")
-    if xsrf:
-        req.add_header("X-XSRF-TOKEN", xsrf)
-    return json.loads(opener.open(req).read().decode("utf-8"))
-
-
 def _sanitize(text: str | None) -> str | None:
     if text is None:
         return None
@@ -45,16 +23,14 @@ def _sanitize(text: str | None) -> str | None:
 
 def main() -> None:
     DOCS.mkdir(parents=True, exist_ok=True)
-    opener, xsrf = _get_session()
+    session = KaggleSession()
 
-    data = _api_post(
-        opener,
-        xsrf,
+    data = session.post_json(
         "https://www.kaggle.com/api/i/competitions.LeaderboardService/GetLeaderboard",
         {"competitionId": COMPETITION_ID},
     )
 
-    (DOCS / "leaderboard_full.json").write_text(json.dumps(data, indent=2))
+    write_json(DOCS / "leaderboard_full.json", data)
 
     teams_by_id = {t["teamId"]: t for t in data.get("teams", [])}
 
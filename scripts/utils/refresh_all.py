@@ -2,6 +2,7 @@
 from __future__ import annotations
 
 import subprocess
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
 
 SCRIPTS = [
@@ -15,8 +16,14 @@ SCRIPTS = [
 
 def main() -> None:
     root = Path(__file__).resolve().parent
-    for script in SCRIPTS:
-        subprocess.run(["python3", str(root / script)], check=True)
+    # Each fetcher writes its own docs files, so they can run side by side.
+    with ThreadPoolExecutor(max_workers=len(SCRIPTS)) as executor:
+        futures = [
+            executor.submit(subprocess.run, ["python3", str(root / script)], check=True)
+            for script in SCRIPTS
+        ]
+        for future in futures:
+            future.result()
 
 
 if __name__ == "__main__":
@@ -12,6 +12,12 @@ def load_per_n(path: Path) -> pd.DataFrame:
 def compare_per_n(path_a: Path, path_b: Path) -> pd.DataFrame:
     df_a = load_per_n(path_a).rename(columns={"group_score": "score_a"})
     df_b = load_per_n(path_b).rename(columns={"group_score": "score_b"})
-    df = df_a.merge(df_b, on="n", how="inner")
+    df_a["n"] = df_a["n"].astype("int32")
+    df_b["n"] = df_b["n"].astype("int32")
+    df = (
+        df_a.set_index("n")
+        .join(df_b.set_index("n"), how="inner", lsuffix="_x", rsuffix="_y")
+        .reset_index()
+    )
     df["delta"] = df["score_b"] - df["score_a"]
     return df.sort_values("delta", ascending=False).reset_index(drop=True)
@@ -4,7 +4,8 @@ from functools import lru_cache
 import math
 from typing import Iterable, Tuple
 
-from shapely import affinity
+import numpy as np
+import shapely
 from shapely.geometry import Polygon
 
 
@@ -36,33 +37,102 @@ TREE_POINTS = (
 )
 
 
+# Geometry is built at the metric's 1e18 scale by default. Doubles keep 53 bits
+# of relative precision at any magnitude, so the scale itself loses nothing,
+# and GEOS predicates run on plain doubles either way. Keeping the metric's
+# scale keeps solver overlap checks as close as possible to how metric.py
+# rounds touching trees.
 @lru_cache(maxsize=4)
 def base_tree_polygon(scale_factor: float = 1e18) -> Polygon:
     scaled = [(x * scale_factor, y * scale_factor) for x, y in TREE_POINTS]
     return Polygon(scaled)
 
 
+@lru_cache(maxsize=4096)
+def _rotation_cos_sin(angle_deg: float) -> Tuple[float, float]:
+    # Same values (and near-zero snapping) as shapely.affinity.rotate, so the
+    # coordinates below are bit-identical to rotate + translate.
+    rad = angle_deg * math.pi / 180.0
+    cosp = math.cos(rad)
+    sinp = math.sin(rad)
+    if abs(cosp) < 2.5e-16:
+        cosp = 0.0
+    if abs(sinp) < 2.5e-16:
+        sinp = 0.0
+    return cosp, sinp
+
+
+@lru_cache(maxsize=4)
+def _base_coords(scale_factor: float) -> np.ndarray:
+    coords = shapely.get_coordinates(base_tree_polygon(scale_factor))
+    coords.flags.writeable = False
+    return coords
+
+
+@lru_cache(maxsize=4096)
+def _rotated_coords(angle_deg: float, scale_factor: float) -> np.ndarray:
+    # Solvers reuse a small set of angles, so only the translation is per call.
+    # The rotation itself is the same elementwise arithmetic as
+    # affinity.affine_transform, done on a cached vertex array so angles that
+    # miss the cache do not build and transform a throwaway Polygon.
+    cosp, sinp = _rotation_cos_sin(angle_deg)
+    base = _base_coords(scale_factor)
+    x = base[:, 0]
+    y = base[:, 1]
+    # Written into a C-ordered buffer: cheaper than stacking on a miss (local
+    # search draws a fresh angle almost every step) and already in the
+    # layout shapely.polygons consumes.
+    coords = np.empty_like(base)
+    coords[:, 0] = cosp * x + -sinp * y + 0.0
+    coords[:, 1] = sinp * x + cosp * y + 0.0
+    coords.flags.writeable = False
+    return coords
+
+
 def build_tree_polygon(
     center_x: float,
     center_y: float,
     angle_deg: float,
     scale_factor: float = 1e18,
 ) -> Polygon:
-    base = base_tree_polygon(scale_factor)
-    rotated = affinity.rotate(base, angle_deg, origin=(0.0, 0.0))
-    return affinity.translate(rotated, xoff=center_x * scale_factor, yoff=center_y * scale_factor)
+    coords = _rotated_coords(float(angle_deg), float(scale_factor))
+    return shapely.polygons(coords + (center_x * scale_factor, center_y * scale_factor))
+
+
+@lru_cache(maxsize=4096)
+def tree_outline_bounds(
+    angle_deg: float, scale_factor: float = 1.0
+) -> Tuple[float, float, float, float]:
+    # Bounds of the rotated outline centred at the origin; a tree at (x, y)
+    # spans these plus its offset. Shared by every solver instance.
+    return build_tree_polygon(0.0, 0.0, angle_deg, scale_factor).bounds
+
+
+def tree_vertex_stack(angles: Iterable[float], scale_factor: float = 1e18) -> np.ndarray:
+    # (n, vertices, 2) rotated outlines centred at the origin; pair with
+    # build_tree_polygons when the angles stay fixed across many translations.
+    sf = float(scale_factor)
+    return np.stack([_rotated_coords(float(a), sf) for a in angles])
+
+
+def build_tree_polygons(
+    vertex_stack: np.ndarray,
+    center_x: np.ndarray,
+    center_y: np.ndarray,
+    scale_factor: float = 1e18,
+) -> np.ndarray:
+    offsets = np.stack([center_x * scale_factor, center_y * scale_factor], axis=-1)
+    return shapely.polygons(vertex_stack + offsets[:, None, :])
 
 
 def polygons_bounds(polygons: Iterable[Polygon]) -> Tuple[float, float, float, float]:
-    minx = miny = float("inf")
-    maxx = maxy = float("-inf")
-    for poly in polygons:
-        bx0, by0, bx1, by1 = poly.bounds
-        minx = min(minx, bx0)
-        miny = min(miny, by0)
-        maxx = max(maxx, bx1)
-        maxy = max(maxy, by1)
-    return minx, miny, maxx, maxy
+    geoms = np.fromiter(polygons, dtype=object)
+    if geoms.size == 0:
+        return float("inf"), float("inf"), float("-inf"), float("-inf")
+    bounds = shapely.bounds(geoms)
+    mins = bounds[:, :2].min(axis=0)
+    maxs = bounds[:, 2:].max(axis=0)
+    return float(mins[0]), float(mins[1]), float(maxs[0]), float(maxs[1])
 
 
 @lru_cache(maxsize=1)
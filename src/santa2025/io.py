@@ -1,11 +1,26 @@
 from __future__ import annotations
 
 from dataclasses import dataclass
+import json
 from pathlib import Path
-from typing import Dict, Iterable, List, Tuple
+from typing import Any, Dict, Iterable, List
 
+import numpy as np
 import pandas as pd
 
+try:
+    import orjson
+    ORJSON_AVAILABLE = True
+except ImportError:
+    ORJSON_AVAILABLE = False
+
+try:
+    import pyarrow as pa
+    import pyarrow.csv as pa_csv
+    PYARROW_AVAILABLE = True
+except ImportError:
+    PYARROW_AVAILABLE = False
+
 
 @dataclass
 class TreePlacement:
@@ -14,52 +29,116 @@ class TreePlacement:
     deg: float
 
 
-def _format_value(value: float, decimals: int) -> str:
-    return f"s{value:.{decimals}f}"
-
-
 def build_submission(
     groups: Dict[int, List[TreePlacement]],
     decimals: int = 6,
 ) -> pd.DataFrame:
-    rows: List[Tuple[str, str, str, str]] = []
-    for n in sorted(groups.keys()):
-        placements = groups[n]
-        for idx, placement in enumerate(placements):
-            row_id = f"{n:03d}_{idx}"
-            rows.append(
-                (
-                    row_id,
-                    _format_value(placement.x, decimals),
-                    _format_value(placement.y, decimals),
-                    _format_value(placement.deg, decimals),
-                )
-            )
-    return pd.DataFrame(rows, columns=["id", "x", "y", "deg"])
+    # Columnar build: one bound str.format per column mapped over flat lists,
+    # instead of assembling a tuple of f-strings per placement.
+    ordered = sorted(groups.items())
+    ns = [n for n, placements in ordered for _ in placements]
+    idxs = [idx for _, placements in ordered for idx in range(len(placements))]
+    coords = np.array(
+        [(p.x, p.y, p.deg) for _, placements in ordered for p in placements],
+        dtype=np.float64,
+    ).reshape(-1, 3)
+    fmt = f"s{{:.{decimals}f}}".format
+    return pd.DataFrame(
+        {
+            "id": list(map("{:03d}_{}".format, ns, idxs)),
+            "x": list(map(fmt, coords[:, 0].tolist())),
+            "y": list(map(fmt, coords[:, 1].tolist())),
+            "deg": list(map(fmt, coords[:, 2].tolist())),
+        },
+        columns=["id", "x", "y", "deg"],
+    )
 
 
 def write_submission_csv(df: pd.DataFrame, path: Path) -> None:
     path.parent.mkdir(parents=True, exist_ok=True)
+    # pyarrow's writer is only used for all-string frames (what build_submission
+    # returns): it formats numbers differently from pandas, and submission
+    # strings never need quoting. Its header is always quoted, so ours is
+    # written by hand to keep the file byte-identical to to_csv.
+    # Decided on the values, not the dtype: object columns count as string
+    # dtype even when they hold floats.
+    if PYARROW_AVAILABLE and all(
+        pd.api.types.infer_dtype(df[c], skipna=True) == "string" for c in df.columns
+    ):
+        table = pa.Table.from_pandas(df, preserve_index=False)
+        options = pa_csv.WriteOptions(include_header=False, quoting_style="none")
+        with path.open("wb") as f:
+            f.write((",".join(map(str, df.columns)) + "\n").encode())
+            pa_csv.write_csv(table, f, write_options=options)
+        return
     df.to_csv(path, index=False)
 
 
+def write_submission_direct(
+    groups: Dict[int, List[TreePlacement]],
+    path: Path,
+    decimals: int = 6,
+) -> None:
+    # Same bytes as build_submission + write_submission_csv, without the
+    # intermediate DataFrame, for callers that only need the file.
+    path.parent.mkdir(parents=True, exist_ok=True)
+    row = f"{{:03d}}_{{}},s{{:.{decimals}f}},s{{:.{decimals}f}},s{{:.{decimals}f}}\n".format
+    with path.open("w", buffering=1 << 20) as f:
+        f.write("id,x,y,deg\n")
+        for n in sorted(groups):
+            f.writelines(row(n, idx, p.x, p.y, p.deg) for idx, p in enumerate(groups[n]))
+
+
+def write_json(path: Path, payload: Any) -> None:
+    if ORJSON_AVAILABLE:
+        path.write_bytes(
+            orjson.dumps(payload, option=orjson.OPT_INDENT_2 | orjson.OPT_NON_STR_KEYS)
+        )
+    else:
+        path.write_text(json.dumps(payload, indent=2))
+
+
+def save_groups_npz(groups: Dict[int, List[TreePlacement]], path: Path) -> None:
+    ordered = sorted(groups.items())
+    coords = np.array(
+        [(p.x, p.y, p.deg) for _, placements in ordered for p in placements],
+        dtype=np.float64,
+    ).reshape(-1, 3)
+    np.savez_compressed(
+        path,
+        group=np.array([n for n, placements in ordered for _ in placements], dtype=np.int32),
+        idx=np.array(
+            [idx for _, placements in ordered for idx in range(len(placements))], dtype=np.int32
+        ),
+        x=coords[:, 0],
+        y=coords[:, 1],
+        deg=coords[:, 2],
+    )
+
+
 def load_submission_csv(path: Path) -> pd.DataFrame:
     return pd.read_csv(path)
 
 
 def groups_from_submission(df: pd.DataFrame) -> Dict[int, List[TreePlacement]]:
-    df = df.copy()
-    df["group"] = df["id"].astype(str).str.split("_").str[0].astype(int)
-    df["idx"] = df["id"].astype(str).str.split("_").str[1].astype(int)
-    df = df.sort_values(["group", "idx"]).reset_index(drop=True)
+    ids = df["id"].astype(str).str.split("_", n=1, expand=True)
+    parsed = pd.DataFrame(
+        {
+            "group": ids[0].astype(np.int64).to_numpy(),
+            "idx": ids[1].astype(np.int64).to_numpy(),
+            "x": df["x"].astype(str).str.lstrip("s").astype(np.float64).to_numpy(),
+            "y": df["y"].astype(str).str.lstrip("s").astype(np.float64).to_numpy(),
+            "deg": df["deg"].astype(str).str.lstrip("s").astype(np.float64).to_numpy(),
+        }
+    )
+    parsed = parsed.sort_values(["group", "idx"], kind="stable")
+
+    group_ids = parsed["group"].to_numpy()
+    coords = parsed[["x", "y", "deg"]].to_numpy().tolist()
+    ns, starts = np.unique(group_ids, return_index=True)
+    ends = list(starts[1:]) + [len(coords)]
 
     groups: Dict[int, List[TreePlacement]] = {}
-    for n, df_group in df.groupby("group"):
-        placements: List[TreePlacement] = []
-        for _, row in df_group.iterrows():
-            x = float(str(row["x"]).lstrip("s"))
-            y = float(str(row["y"]).lstrip("s"))
-            deg = float(str(row["deg"]).lstrip("s"))
-            placements.append(TreePlacement(x=x, y=y, deg=deg))
-        groups[int(n)] = placements
+    for n, start, end in zip(ns.tolist(), starts.tolist(), ends):
+        groups[n] = [TreePlacement(x=x, y=y, deg=deg) for x, y, deg in coords[start:end]]
     return groups
@@ -0,0 +1,58 @@
+from __future__ import annotations
+
+import http.cookiejar
+import json
+import urllib.request
+
+try:
+    import requests
+    from requests.adapters import HTTPAdapter
+    REQUESTS_AVAILABLE = True
+except ImportError:
+    REQUESTS_AVAILABLE = False
+
+
+KAGGLE_URL = "https://www.kaggle.com"
+
+
+class KaggleSession:
+    """Cookie-carrying Kaggle web session shared by the fetch_*.py scripts.
+
+    Uses a pooled ``requests.Session`` when requests is installed, so repeated
+    calls reuse one TLS connection; falls back to a urllib opener otherwise.
+    """
+
+    def __init__(self) -> None:
+        self.xsrf: str | None = None
+        if REQUESTS_AVAILABLE:
+            self._session = requests.Session()
+            self._session.mount("https://", HTTPAdapter(pool_connections=4, pool_maxsize=10))
+            self._session.get(KAGGLE_URL).raise_for_status()
+            self.xsrf = self._session.cookies.get("XSRF-TOKEN")
+        else:
+            cj = http.cookiejar.CookieJar()
+            self._opener = urllib.request.build_opener(urllib.request.HTTPCookieProcessor(cj))
+            self._opener.open(KAGGLE_URL).read()
+            for c in cj:
+                if c.name == "XSRF-TOKEN":
+                    self.xsrf = c.value
+                    break
+
+    def get_json(self, url: str) -> dict:
+        if REQUESTS_AVAILABLE:
+            response = self._session.get(url)
+            response.raise_for_status()
+            return response.json()
+        return json.loads(self._opener.open(url).read().decode("utf-8"))
+
+    def post_json(self, url: str, payload: dict) -> dict:
+        headers = {"Content-Type": "application/json"}
+        if self.xsrf:
+            headers["X-XSRF-TOKEN"] = self.xsrf
+        body = json.dumps(payload).encode("utf-8")
+        if REQUESTS_AVAILABLE:
+            response = self._session.post(url, data=body, headers=headers)
+            response.raise_for_status()
+            return response.json()
+        req = urllib.request.Request(url, data=body, headers=headers)
+        return json.loads(self._opener.open(req).read().decode("utf-8"))
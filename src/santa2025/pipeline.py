@@ -1,6 +1,5 @@
 from __future__ import annotations
 
-import json
 import time
 from concurrent.futures import ProcessPoolExecutor
 from dataclasses import asdict
@@ -10,7 +9,14 @@ from typing import Dict, List, Tuple
 import pandas as pd
 import yaml
 
-from santa2025.io import TreePlacement, build_submission, write_submission_csv
+from santa2025.io import (
+    TreePlacement,
+    build_submission,
+    save_groups_npz,
+    write_json,
+    write_submission_csv,
+    write_submission_direct,
+)
 from santa2025.metric import score_detailed
 from santa2025.scoring import per_group_dataframe, top_groups
 from santa2025.solver.greedy import GreedyIncrementalSolver
@@ -19,11 +25,25 @@ from santa2025.solver.local_search import LocalSearchConfig, LocalSearchRefiner
 from santa2025.solver.pattern import PatternConfig, PatternSolver
 from santa2025.solver.periodic import PeriodicBasis, PeriodicConfig, PeriodicSolver
 
+try:
+    from yaml import CSafeLoader as _YamlLoader
+except ImportError:
+    from yaml import SafeLoader as _YamlLoader
 
-def _refine_group(args: Tuple[int, List[TreePlacement], dict, int]) -> Tuple[int, List[TreePlacement], float]:
-    n, placements, config_dict, seed = args
-    config = LocalSearchConfig(**config_dict)
-    refiner = LocalSearchRefiner(config)
+
+# Set once per refine worker by _init_refine_worker, so tasks only carry the
+# group itself rather than a copy of the (invariant) config.
+_REFINE_CONFIG: LocalSearchConfig | None = None
+
+
+def _init_refine_worker(config_dict: dict) -> None:
+    global _REFINE_CONFIG
+    _REFINE_CONFIG = LocalSearchConfig(**config_dict)
+
+
+def _refine_group(args: Tuple[int, List[TreePlacement], int]) -> Tuple[int, List[TreePlacement], float]:
+    n, placements, seed = args
+    refiner = LocalSearchRefiner(_REFINE_CONFIG)
     print(f"refine group {n}: start seed={seed}", flush=True)
     refined, score = refiner.refine(placements, seed=seed)
     print(f"refine group {n}: done score={score:.6f}", flush=True)
@@ -33,10 +53,19 @@ def _refine_group(args: Tuple[int, List[TreePlacement], dict, int]) -> Tuple[int
 def _serialize_groups(groups: Dict[int, List[TreePlacement]]) -> dict:
     payload = {}
     for n, placements in groups.items():
-        payload[str(n)] = [asdict(p) for p in placements]
+        payload[str(n)] = [{"x": p.x, "y": p.y, "deg": p.deg} for p in placements]
     return payload
 
 
+def _write_groups(
+    groups: Dict[int, List[TreePlacement]], output_dir: Path, stage: str, fmt: str
+) -> None:
+    if fmt == "json":
+        write_json(output_dir / f"groups_{stage}.json", _serialize_groups(groups))
+    else:
+        save_groups_npz(groups, output_dir / f"groups_{stage}.npz")
+
+
 def _parse_target_ns(value) -> List[int] | None:
     if value is None:
         return None
@@ -66,6 +95,7 @@ def run_experiment(config: dict, output_dir: Path) -> None:
     seed = int(config.get("seed", 1337))
     n_max = int(config.get("n_max", 200))
     decimals = int(config.get("output_decimals", 6))
+    groups_format = str(config.get("groups_format", "npz"))
 
     baseline_cfg = config.get("baseline", {})
     mode = baseline_cfg.get("mode", "incremental")
@@ -141,6 +171,7 @@ def run_experiment(config: dict, output_dir: Path) -> None:
             squeeze_factor=float(baseline_cfg.get("squeeze_factor", 0.985)),
             squeeze_steps=int(baseline_cfg.get("squeeze_steps", 20)),
             squeeze_iters=int(baseline_cfg.get("squeeze_iters", 8)),
+            max_workers=int(baseline_cfg.get("max_workers", 1)),
         )
         solver = PeriodicSolver(periodic_cfg)
         print(
@@ -162,6 +193,9 @@ def run_experiment(config: dict, output_dir: Path) -> None:
             scale_factor=float(baseline_cfg.get("scale_factor", 1e18)),
             bounds=float(baseline_cfg.get("bounds", 100.0)),
             fallback_attempts=int(baseline_cfg.get("fallback_attempts", 2)),
+            max_workers=int(baseline_cfg.get("max_workers", 0)),
+            patience=int(baseline_cfg.get("patience", 0)),
+            stopping_tol=float(baseline_cfg.get("stopping_tol", 0.0)),
         )
         solver = IndependentSolver(independent_cfg)
         print(
@@ -199,16 +233,14 @@ def run_experiment(config: dict, output_dir: Path) -> None:
     df_groups = per_group_dataframe(per_group)
     df_groups.to_csv(output_dir / "per_n.csv", index=False)
     write_submission_csv(submission, output_dir / "submission.csv")
-    (output_dir / "groups_baseline.json").write_text(
-        json.dumps(_serialize_groups(groups), indent=2)
-    )
+    _write_groups(groups, output_dir, "baseline", groups_format)
 
     summary = {
         "stage": "baseline",
         "total_score": total_score,
         "config": config,
     }
-    (output_dir / "summary_baseline.json").write_text(json.dumps(summary, indent=2))
+    write_json(output_dir / "summary_baseline.json", summary)
 
     refine_cfg = config.get("refine", {})
     if not refine_cfg.get("enabled", True):
@@ -238,6 +270,8 @@ def run_experiment(config: dict, output_dir: Path) -> None:
         scale_factor=float(refine_cfg.get("scale_factor", 1e18)),
         bounds=float(refine_cfg.get("bounds", 100.0)),
         log_every_steps=int(refine_cfg.get("log_every_steps", 0)),
+        restart_workers=int(refine_cfg.get("restart_workers", 1)),
+        angle_quantum=float(refine_cfg.get("angle_quantum", 0.0)),
     )
 
     max_workers = int(refine_cfg.get("max_workers", 1))
@@ -249,29 +283,39 @@ def run_experiment(config: dict, output_dir: Path) -> None:
         f"log_every_steps={ls_config.log_every_steps}",
         flush=True,
     )
-    tasks = [(n, groups[n], asdict(ls_config), seed + n) for n in targets]
+    tasks = [(n, groups[n], seed + n) for n in targets]
+    config_dict = asdict(ls_config)
 
     results: List[Tuple[int, List[TreePlacement], float]] = []
     if max_workers > 1:
-        with ProcessPoolExecutor(max_workers=max_workers) as executor:
+        with ProcessPoolExecutor(
+            max_workers=max_workers,
+            initializer=_init_refine_worker,
+            initargs=(config_dict,),
+        ) as executor:
             for result in executor.map(_refine_group, tasks):
                 results.append(result)
     else:
+        _init_refine_worker(config_dict)
         for task in tasks:
             results.append(_refine_group(task))
 
     for n, refined, _ in results:
         groups[n] = refined
 
-    submission_refined = build_submission(groups, decimals=decimals)
-    total_score_refined, per_group_refined = score_detailed(submission_refined)
+    # Untouched groups keep their baseline scores; only the refined groups are
+    # re-scored, on their rounded output rows so the totals match the CSV.
+    refined_ns = sorted({n for n, _, _ in results})
+    _, refined_scores = score_detailed(
+        build_submission({n: groups[n] for n in refined_ns}, decimals=decimals)
+    )
+    per_group_refined = {**per_group, **refined_scores}
+    total_score_refined = sum(per_group_refined.values())
     df_groups_refined = per_group_dataframe(per_group_refined)
 
     df_groups_refined.to_csv(output_dir / "per_n_refined.csv", index=False)
-    write_submission_csv(submission_refined, output_dir / "submission_refined.csv")
-    (output_dir / "groups_refined.json").write_text(
-        json.dumps(_serialize_groups(groups), indent=2)
-    )
+    write_submission_direct(groups, output_dir / "submission_refined.csv", decimals=decimals)
+    _write_groups(groups, output_dir, "refined", groups_format)
 
     summary_refined = {
         "stage": "refined",
@@ -280,7 +324,7 @@ def run_experiment(config: dict, output_dir: Path) -> None:
         "targets": targets,
         "config": config,
     }
-    (output_dir / "summary_refined.json").write_text(json.dumps(summary_refined, indent=2))
+    write_json(output_dir / "summary_refined.json", summary_refined)
     total_time = time.perf_counter() - start_time
     print(
         f"refine score={total_score_refined:.6f} total_time_s={total_time:.1f}",
@@ -290,4 +334,4 @@ def run_experiment(config: dict, output_dir: Path) -> None:
 
 def load_config(path: Path) -> dict:
     with path.open("r") as f:
-        return yaml.safe_load(f)
+        return yaml.load(f, Loader=_YamlLoader)
@@ -1,5 +1,6 @@
 from __future__ import annotations
 
+import heapq
 from typing import Dict, Iterable, List
 
 import pandas as pd
@@ -19,5 +20,5 @@ def per_group_dataframe(per_group: Dict[int, float]) -> pd.DataFrame:
 
 
 def top_groups(per_group: Dict[int, float], top_k: int) -> List[int]:
-    df = per_group_dataframe(per_group)
-    return df.head(top_k)["n"].tolist()
+    best = heapq.nlargest(top_k, per_group.items(), key=lambda item: item[1])
+    return [n for n, _ in best]
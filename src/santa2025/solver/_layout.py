@@ -0,0 +1,132 @@
+from __future__ import annotations
+
+from typing import Callable, Dict, List, Sequence, Tuple
+
+import numpy as np
+import shapely
+from shapely.strtree import STRtree
+
+from santa2025.geometry import build_tree_polygons, tree_vertex_stack
+
+# Layout helpers shared by the lattice solvers (periodic, row and pattern).
+
+# Trees checked one at a time before has_collision falls back to a bulk query.
+_COLLISION_HEAD = 4
+
+Bounds = Tuple[float, float, float, float]
+
+
+def angle_id(
+    index: Dict[float, int],
+    lut: np.ndarray,
+    angle: float,
+    bounds_for_angle: Callable[[float], Bounds],
+) -> Tuple[int, np.ndarray]:
+    # Row of angle in the (K, 4) outline-bounds table. A new angle grows
+    # the table, so the caller keeps the returned array.
+    idx = index.get(angle)
+    if idx is None:
+        idx = len(index)
+        index[angle] = idx
+        lut = np.vstack([lut, bounds_for_angle(angle)])
+    return idx, lut
+
+
+def angle_boxes(
+    index: Dict[float, int],
+    lut: np.ndarray,
+    degs: Sequence[float],
+    bounds_for_angle: Callable[[float], Bounds],
+) -> Tuple[np.ndarray, np.ndarray]:
+    # (N, 4) outline bounds per tree, gathered from the per-angle table,
+    # along with the table itself in case it grew.
+    ids = [index.get(deg, -1) for deg in degs]
+    if -1 in ids:
+        ids = []
+        for deg in degs:
+            idx, lut = angle_id(index, lut, deg, bounds_for_angle)
+            ids.append(idx)
+    return lut[ids], lut
+
+
+def score_and_bounds(
+    xs: np.ndarray, ys: np.ndarray, boxes: np.ndarray
+) -> Tuple[float, Bounds]:
+    minx = float((xs + boxes[:, 0]).min())
+    miny = float((ys + boxes[:, 1]).min())
+    maxx = float((xs + boxes[:, 2]).max())
+    maxy = float((ys + boxes[:, 3]).max())
+    side = max(maxx - minx, maxy - miny)
+    score = (side * side) / xs.size
+    return score, (minx, miny, maxx, maxy)
+
+
+def square_search(
+    extents: np.ndarray, n: int, dx: float, dy: float, center_steps: int
+) -> Tuple[np.ndarray, Bounds]:
+    # Pick the n tiles (rows of extents: minx, miny, maxx, maxy) that fit
+    # the smallest square about any of the centre offsets, and return
+    # their indices in rank order with the bounds of the selection.
+    steps = max(1, int(center_steps))
+    offsets_x = np.array([dx * (i / steps) for i in range(steps)])
+    offsets_y = np.array([dy * (i / steps) for i in range(steps)])
+
+    count = extents.shape[0]
+    x0, y0, x1, y1 = extents.T
+
+    # Rank every tile for all centre offsets at once: column k of the
+    # (N, steps * steps) table is centre (offsets_x[k // steps],
+    # offsets_y[k % steps]), the order the nested loops visited them in.
+    hx = np.maximum(np.abs(x0[:, None] - offsets_x), np.abs(x1[:, None] - offsets_x))
+    hy = np.maximum(np.abs(y0[:, None] - offsets_y), np.abs(y1[:, None] - offsets_y))
+    reach = np.maximum(hx[:, :, None], hy[:, None, :]).reshape(count, -1)
+    # Select the n nearest per column in linear time. The lattice is
+    # symmetric, so ties at the cut are common; they go to the earliest
+    # tiles, the same set a stable sort would keep.
+    cut = np.partition(reach, n - 1, axis=0)[n - 1]
+    below = reach < cut
+    tied = reach == cut
+    take = below | (tied & (np.cumsum(tied, axis=0) <= n - below.sum(axis=0)))
+    minx = np.where(take, x0[:, None], np.inf).min(axis=0)
+    miny = np.where(take, y0[:, None], np.inf).min(axis=0)
+    maxx = np.where(take, x1[:, None], -np.inf).max(axis=0)
+    maxy = np.where(take, y1[:, None], -np.inf).max(axis=0)
+    side = np.maximum(maxx - minx, maxy - miny)
+    # argmin takes the first of equal scores, as the strict < did.
+    best = int(np.argmin((side * side) / n))
+    # Only the winner needs its trees in rank order. Its bounds are the
+    # ones score_and_bounds would find for the selection.
+    chosen = np.flatnonzero(take[:, best])
+    bounds = (float(minx[best]), float(miny[best]), float(maxx[best]), float(maxy[best]))
+    return chosen[np.argsort(reach[chosen, best], kind="stable")], bounds
+
+
+def has_collision(xs: np.ndarray, ys: np.ndarray, degs: List[float], scale: float) -> bool:
+    # Squeeze probes that collide almost always do so at their first
+    # trees, so those are checked one by one and can stop early. Probes
+    # that get past them are mostly collision-free, and for those one
+    # bulk query over the remaining trees is far cheaper than carrying
+    # on tree by tree. The polygons are built in one batch from the
+    # cached rotated outlines. They are not prepared: each meets only a
+    # few neighbours, too few calls to pay back the indexing.
+    stack = tree_vertex_stack(degs, scale)
+    polys = build_tree_polygons(stack, xs, ys, scale)
+    tree = STRtree(polys)
+    head = min(_COLLISION_HEAD, len(polys))
+    for i in range(head):
+        poly = polys[i]
+        for idx in tree.query(poly, predicate="intersects"):
+            if idx <= i:
+                continue
+            if not poly.touches(polys[idx]):
+                return True
+    if head == len(polys):
+        return False
+    # Pairs touching the head trees were covered above, and each pair
+    # among the rest is reported both ways, so keep one direction.
+    src, dst = tree.query(polys[head:], predicate="intersects")
+    src = src + head
+    keep = src < dst
+    if not keep.any():
+        return False
+    return bool((~shapely.touches(polys[src[keep]], polys[dst[keep]])).any())
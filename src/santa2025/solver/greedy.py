@@ -5,6 +5,7 @@ import random
 from dataclasses import dataclass
 from typing import Dict, List, Optional
 
+import shapely
 from shapely.strtree import STRtree
 
 from santa2025.geometry import build_tree_polygon, polygons_bounds
@@ -31,11 +32,15 @@ def _random_rotation(rng: random.Random) -> float:
 
 
 def _collides(candidate, polygons, tree_index: STRtree) -> bool:
-    indices = tree_index.query(candidate)
-    for idx in indices:
-        if candidate.intersects(polygons[idx]) and not candidate.touches(polygons[idx]):
-            return True
-    return False
+    # The tree filters to true intersections in one C call; only those hits
+    # need the (vectorized) touches check. polygons is an object ndarray.
+    # touches stays cheaper here than an intersection-area threshold (which
+    # also builds the overlap geometry) and than dropping the tree for a
+    # bounding-box or all-pairs scan at these group sizes.
+    indices = tree_index.query(candidate, predicate="intersects")
+    if indices.size == 0:
+        return False
+    return bool((~shapely.touches(candidate, polygons[indices])).any())
 
 
 def _bounding_square_side(polygons, scale_factor: float) -> float:
@@ -68,8 +73,8 @@ class GreedyIncrementalSolver:
             poly = build_tree_polygon(0.0, 0.0, angle_deg, self.scale_factor)
             return PlacedTree(x=0.0, y=0.0, deg=angle_deg, polygon=poly)
 
-        polygons = [p.polygon for p in placed]
-        tree_index = STRtree(polygons)
+        tree_index = STRtree([p.polygon for p in placed])
+        polygons = tree_index.geometries
 
         best_x = 0.0
         best_y = 0.0
@@ -80,37 +85,35 @@ class GreedyIncrementalSolver:
             vx = math.cos(vec_angle)
             vy = math.sin(vec_angle)
 
-            radius = self.start_radius
-            collision_found = False
-
-            while radius >= 0.0:
-                px = radius * vx
-                py = radius * vy
-                candidate = build_tree_polygon(px, py, angle_deg, self.scale_factor)
-
-                if _collides(candidate, polygons, tree_index):
-                    collision_found = True
-                    break
-                radius -= self.step_in
-
-            if collision_found:
-                while True:
-                    radius += self.step_out
-                    px = radius * vx
-                    py = radius * vy
-                    candidate = build_tree_polygon(px, py, angle_deg, self.scale_factor)
-                    if not _collides(candidate, polygons, tree_index):
-                        break
-            else:
+            def collides_at(r: float) -> bool:
+                candidate = build_tree_polygon(r * vx, r * vy, angle_deg, self.scale_factor)
+                return _collides(candidate, polygons, tree_index)
+
+            if not collides_at(0.0):
                 radius = 0.0
-                px = 0.0
-                py = 0.0
-                candidate = build_tree_polygon(px, py, angle_deg, self.scale_factor)
+            else:
+                # Bisect between a colliding radius and a free one down to
+                # step_out, instead of walking in by step_in and back out by
+                # step_out. If start_radius is still blocked, grow outward.
+                lo = 0.0
+                hi = self.start_radius
+                grow = self.step_in
+                while collides_at(hi):
+                    lo = hi
+                    hi += grow
+                    grow *= 2.0
+                while hi - lo > self.step_out:
+                    mid = 0.5 * (lo + hi)
+                    if collides_at(mid):
+                        lo = mid
+                    else:
+                        hi = mid
+                radius = hi
 
             if radius < best_radius:
                 best_radius = radius
-                best_x = px
-                best_y = py
+                best_x = radius * vx
+                best_y = radius * vy
 
         poly = build_tree_polygon(best_x, best_y, angle_deg, self.scale_factor)
         return PlacedTree(x=best_x, y=best_y, deg=angle_deg, polygon=poly)
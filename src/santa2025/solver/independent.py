@@ -1,13 +1,25 @@
 from __future__ import annotations
 
 import math
+import os
 import random
+from collections import namedtuple
+from concurrent.futures import ProcessPoolExecutor
 from dataclasses import dataclass
+from functools import lru_cache
 from typing import Dict, List, Tuple
 
+import numpy as np
+import shapely
 from shapely.strtree import STRtree
 
-from santa2025.geometry import build_tree_polygon, polygons_bounds, tree_max_radius
+from santa2025.geometry import (
+    build_tree_polygon,
+    build_tree_polygons,
+    polygons_bounds,
+    tree_max_radius,
+    tree_vertex_stack,
+)
 from santa2025.io import TreePlacement
 from santa2025.solver.greedy import GreedyIncrementalSolver
 
@@ -24,23 +36,32 @@ class IndependentConfig:
     scale_factor: float = 1e18
     bounds: float = 100.0
     fallback_attempts: int = 2
+    max_workers: int = 0
+    patience: int = 0
+    stopping_tol: float = 0.0
 
 
-def _hex_points(n: int, spacing: float) -> List[Tuple[float, float]]:
+# Internal structure-of-arrays form used by the squeeze loop; TreePlacement
+# lists are only built at the solver boundary.
+_PlacementArrays = namedtuple("_PlacementArrays", "x y deg")
+
+
+@lru_cache(maxsize=512)
+def _hex_points(n: int, spacing: float) -> Tuple[Tuple[float, float], ...]:
+    # Cached: every restart for a given n asks for the same lattice.
     side = int(math.ceil(math.sqrt(n))) + 3
     dx = spacing
     dy = spacing * math.sqrt(3.0) / 2.0
 
-    points: List[Tuple[float, float]] = []
-    for row in range(-side, side + 1):
-        y = row * dy
-        offset = (row & 1) * (dx / 2.0)
-        for col in range(-side, side + 1):
-            x = col * dx + offset
-            points.append((x, y))
+    rows = np.arange(-side, side + 1)[:, None]
+    cols = np.arange(-side, side + 1)[None, :]
+    y = np.broadcast_to(rows * dy, (rows.size, cols.size)).ravel()
+    x = (cols * dx + (rows & 1) * (dx / 2.0)).ravel()
 
-    points.sort(key=lambda p: p[0] * p[0] + p[1] * p[1])
-    return points[:n]
+    # Stable sort keeps the row-major order among equal radii, which the
+    # lattice is full of.
+    order = np.argsort(x * x + y * y, kind="stable")[:n]
+    return tuple(zip(x[order].tolist(), y[order].tolist()))
 
 
 def _build_polygons(placements: List[TreePlacement], scale_factor: float):
@@ -48,14 +69,15 @@ def _build_polygons(placements: List[TreePlacement], scale_factor: float):
 
 
 def _has_collision(polygons) -> bool:
+    # One bulk GEOS query for every intersecting pair, then a vectorized
+    # touches check on each unordered pair.
     tree = STRtree(polygons)
-    for i, poly in enumerate(polygons):
-        for idx in tree.query(poly):
-            if idx == i:
-                continue
-            if poly.intersects(polygons[idx]) and not poly.touches(polygons[idx]):
-                return True
-    return False
+    left, right = tree.query(tree.geometries, predicate="intersects")
+    pairs = left < right
+    if not pairs.any():
+        return False
+    geoms = tree.geometries
+    return bool((~shapely.touches(geoms[left[pairs]], geoms[right[pairs]])).any())
 
 
 def _bounding_side(polygons, scale_factor: float) -> float:
@@ -69,53 +91,61 @@ def _group_score(polygons, scale_factor: float) -> float:
 
 
 def _apply_squeeze(
-    placements: List[TreePlacement],
+    arrays: _PlacementArrays,
     factor: float,
     steps: int,
     scale_factor: float,
-) -> List[TreePlacement]:
-    current = placements
+) -> _PlacementArrays:
+    # Angles never change while squeezing, so the rotated outlines are built
+    # once and every step only translates them.
+    vertices = tree_vertex_stack(arrays.deg.tolist(), scale_factor)
+    current = arrays
     for _ in range(steps):
-        scaled = [
-            TreePlacement(x=p.x * factor, y=p.y * factor, deg=p.deg) for p in current
-        ]
-        polygons = _build_polygons(scaled, scale_factor)
+        scaled = _PlacementArrays(current.x * factor, current.y * factor, current.deg)
+        polygons = build_tree_polygons(vertices, scaled.x, scaled.y, scale_factor)
         if _has_collision(polygons):
             break
         current = scaled
     return current
 
 
+def _solve_single_n(
+    task: Tuple[IndependentConfig, int, List[int], int],
+) -> Tuple[int, List[TreePlacement]]:
+    config, n, seeds, fallback_seed = task
+    return n, IndependentSolver(config)._solve_n(n, seeds, fallback_seed)
+
+
 class IndependentSolver:
     def __init__(self, config: IndependentConfig) -> None:
         self.config = config
 
-    def _angles(self, rng: random.Random, n: int) -> List[float]:
+    def _angles(self, rng: np.random.Generator, n: int) -> np.ndarray:
         if self.config.angle_mode == "alternating":
-            return [0.0 if (i % 2 == 0) else 180.0 for i in range(n)]
-        return [rng.uniform(0.0, 360.0) for _ in range(n)]
+            return np.where(np.arange(n) % 2 == 0, 0.0, 180.0)
+        return rng.uniform(0.0, 360.0, size=n)
 
-    def _build_initial(self, rng: random.Random, n: int) -> List[TreePlacement]:
+    def _build_initial(self, rng: np.random.Generator, n: int) -> List[TreePlacement]:
         base_spacing = 2.0 * tree_max_radius() * self.config.spacing_scale
-        points = _hex_points(n, base_spacing)
+        points = np.array(_hex_points(n, base_spacing), dtype=np.float64).reshape(-1, 2)
 
         jitter = self.config.jitter
         angles = self._angles(rng, n)
-        placements = []
-        for (x, y), angle in zip(points, angles):
-            jx = rng.uniform(-jitter, jitter)
-            jy = rng.uniform(-jitter, jitter)
-            placements.append(TreePlacement(x=x + jx, y=y + jy, deg=angle))
-
-        placements = _apply_squeeze(
-            placements,
+        shifted = points + rng.uniform(-jitter, jitter, size=points.shape)
+        arrays = _PlacementArrays(shifted[:, 0], shifted[:, 1], angles)
+
+        arrays = _apply_squeeze(
+            arrays,
             factor=self.config.squeeze_factor,
             steps=self.config.squeeze_steps,
             scale_factor=self.config.scale_factor,
         )
-        return placements
+        return [
+            TreePlacement(x=x, y=y, deg=deg)
+            for x, y, deg in zip(arrays.x.tolist(), arrays.y.tolist(), arrays.deg.tolist())
+        ]
 
-    def _build_candidate(self, rng: random.Random, n: int) -> List[TreePlacement] | None:
+    def _build_candidate(self, rng: np.random.Generator, n: int) -> List[TreePlacement] | None:
         placements = self._build_initial(rng, n)
         polygons = _build_polygons(placements, self.config.scale_factor)
         if _has_collision(polygons):
@@ -127,26 +157,49 @@ class IndependentSolver:
         groups = solver.solve(n_max=n, seed=seed)
         return groups[n]
 
-    def solve(self, n_max: int, seed: int) -> Dict[int, List[TreePlacement]]:
-        rng = random.Random(seed)
-        groups: Dict[int, List[TreePlacement]] = {}
-
-        for n in range(1, n_max + 1):
-            best = None
-            best_score = float("inf")
-            for _ in range(self.config.init_restarts):
-                candidate = self._build_candidate(rng, n)
-                if candidate is None:
-                    continue
+    def _solve_n(self, n: int, seeds: List[int], fallback_seed: int) -> List[TreePlacement]:
+        # Stop once `patience` restarts in a row fail to beat the best by more
+        # than stopping_tol. Off by default (0): stopping after a few stale
+        # restarts costs score, so every restart runs unless a config opts in.
+        best = None
+        best_score = float("inf")
+        stale = 0
+        for restart_seed in seeds:
+            candidate = self._build_candidate(np.random.default_rng(restart_seed), n)
+            score = float("inf")
+            if candidate is not None:
                 polygons = _build_polygons(candidate, self.config.scale_factor)
                 score = _group_score(polygons, self.config.scale_factor)
-                if score < best_score:
-                    best_score = score
-                    best = candidate
+            if candidate is not None and score < best_score:
+                stale = 0 if best_score - score > self.config.stopping_tol else stale + 1
+                best_score = score
+                best = candidate
+            else:
+                stale += 1
+            if self.config.patience > 0 and stale >= self.config.patience:
+                break
+
+        if best is None:
+            best = self._fallback(fallback_seed, n)
+        return best
 
-            if best is None:
-                best = self._fallback(seed + n, n)
-
-            groups[n] = best
+    def solve(self, n_max: int, seed: int) -> Dict[int, List[TreePlacement]]:
+        rng = random.Random(seed)
 
-        return groups
+        # Every n is independent: restart seeds are drawn up front in n order
+        # and each n is solved in its own task, so results do not depend on
+        # the worker count. Largest n go first since they take longest.
+        tasks = []
+        for n in range(1, n_max + 1):
+            seeds = [rng.randrange(2**63) for _ in range(self.config.init_restarts)]
+            tasks.append((self.config, n, seeds, seed + n))
+        tasks.reverse()
+
+        max_workers = min(self.config.max_workers or os.cpu_count() or 1, len(tasks))
+        if max_workers > 1:
+            with ProcessPoolExecutor(max_workers=max_workers) as executor:
+                solved = dict(executor.map(_solve_single_n, tasks))
+        else:
+            solved = dict(map(_solve_single_n, tasks))
+
+        return {n: solved[n] for n in sorted(solved)}
@@ -1,26 +1,79 @@
 from __future__ import annotations
 
 import math
+import os
 import random
 import time
+from concurrent.futures import ProcessPoolExecutor
 from dataclasses import dataclass
 from typing import List, Tuple
 
+import numpy as np
+import shapely
 from shapely.geometry import Polygon
 from shapely.strtree import STRtree
 
-from santa2025.geometry import build_tree_polygon, polygons_bounds
+from santa2025.geometry import (
+    build_tree_polygon,
+    build_tree_polygons,
+    tree_vertex_stack,
+)
 from santa2025.io import TreePlacement
 
+try:
+    from sortedcontainers import SortedList
+    SORTEDCONTAINERS_AVAILABLE = True
+except ImportError:
+    SORTEDCONTAINERS_AVAILABLE = False
+
 
 @dataclass
 class TreeState:
+    # Plain slots: refine converts to TreeStateArray, so these only carry
+    # placements across the API boundary and need no per-instance __dict__.
+    __slots__ = ("x", "y", "deg", "polygon")
+
     x: float
     y: float
     deg: float
     polygon: Polygon
 
 
+class TreeStateArray:
+    """Structure-of-arrays form of a group's trees used inside refine."""
+
+    def __init__(self, xs: np.ndarray, ys: np.ndarray, degs: np.ndarray, polygons: List[Polygon]):
+        self.xs = xs
+        self.ys = ys
+        self.degs = degs
+        self.polygons = polygons
+
+    @classmethod
+    def from_states(cls, states: List[TreeState]) -> "TreeStateArray":
+        return cls(
+            np.array([s.x for s in states], dtype=np.float64),
+            np.array([s.y for s in states], dtype=np.float64),
+            np.array([s.deg for s in states], dtype=np.float64),
+            [s.polygon for s in states],
+        )
+
+    def __len__(self) -> int:
+        return len(self.polygons)
+
+    def aabbs(self) -> np.ndarray:
+        return shapely.bounds(np.fromiter(self.polygons, dtype=object, count=len(self.polygons)))
+
+    def dist_sum(self) -> float:
+        """Sum of squared distances from origin (for gravity term)."""
+        return float(self.xs @ self.xs + self.ys @ self.ys)
+
+    def to_placements(self) -> List[TreePlacement]:
+        return [
+            TreePlacement(x=x, y=y, deg=deg)
+            for x, y, deg in zip(self.xs.tolist(), self.ys.tolist(), self.degs.tolist())
+        ]
+
+
 @dataclass
 class LocalSearchConfig:
     steps: int = 5000
@@ -36,22 +89,114 @@ class LocalSearchConfig:
     bounds: float = 100.0
     log_every_steps: int = 0
     gravity_weight: float = 0.0  # Compactness term: 1e-4 for small n, 0 to disable
+    restart_workers: int = 1  # Processes for independent restarts; 0 uses all CPUs
+    angle_quantum: float = 0.0  # Snap moved angles to this step (deg) so outlines cache; 0 = off
+
+
+class _AabbTracker:
+    """Per-tree bounding boxes plus the running group bounds.
+
+    With sortedcontainers each axis keeps a sorted (value, index) list, so a
+    tentative single-tree move reads the new extremes in O(1) and an accepted
+    one costs O(log N); otherwise the extremes are NumPy reductions.
+    """
+
+    def __init__(self, aabbs: np.ndarray) -> None:
+        self.aabbs = aabbs
+        self._axes = None
+        self._holders: List[int] = []
+        if SORTEDCONTAINERS_AVAILABLE:
+            self._axes = [
+                SortedList(zip(aabbs[:, k].tolist(), range(len(aabbs)))) for k in range(4)
+            ]
+        else:
+            self._find_holders()
+
+    def _find_holders(self) -> None:
+        aabbs = self.aabbs
+        self._holders = [
+            int(aabbs[:, 0].argmin()),
+            int(aabbs[:, 1].argmin()),
+            int(aabbs[:, 2].argmax()),
+            int(aabbs[:, 3].argmax()),
+        ]
+
+    def bounds(self) -> Tuple[float, float, float, float]:
+        if self._axes is not None:
+            minx, miny, maxx, maxy = self._axes
+            return minx[0][0], miny[0][0], maxx[-1][0], maxy[-1][0]
+        return (
+            float(self.aabbs[:, 0].min()),
+            float(self.aabbs[:, 1].min()),
+            float(self.aabbs[:, 2].max()),
+            float(self.aabbs[:, 3].max()),
+        )
+
+    def bounds_with(
+        self, idx: int, box: Tuple[float, float, float, float]
+    ) -> Tuple[float, float, float, float]:
+        """Group bounds if tree idx had bounding box `box`, without committing."""
+        if self._axes is None:
+            saved = self.aabbs[idx].copy()
+            self.aabbs[idx] = box
+            result = self.bounds()
+            self.aabbs[idx] = saved
+            return result
+        result = []
+        for k in range(4):
+            axis = self._axes[k]
+            end = 0 if k < 2 else -1
+            other = axis[end]
+            if other[1] == idx:
+                if len(axis) == 1:
+                    result.append(box[k])
+                    continue
+                other = axis[1 if k < 2 else -2]
+            result.append(min(box[k], other[0]) if k < 2 else max(box[k], other[0]))
+        return result[0], result[1], result[2], result[3]
+
+    def keeps_bounds(self, idx: int, box: Tuple[float, float, float, float]) -> bool:
+        """True if moving tree idx to `box` cannot change the group bounds.
+
+        That holds when idx defines none of the four extremes and `box` stays
+        strictly inside them, which is the case for most moves in a dense pack.
+        """
+        if self._axes is not None:
+            minx, miny, maxx, maxy = self._axes
+            extremes = (minx[0], miny[0], maxx[-1], maxy[-1])
+        else:
+            extremes = tuple(
+                (self.aabbs[holder, k], holder) for k, holder in enumerate(self._holders)
+            )
+        lo_x, lo_y, hi_x, hi_y = extremes
+        if idx in (lo_x[1], lo_y[1], hi_x[1], hi_y[1]):
+            return False
+        return box[0] > lo_x[0] and box[1] > lo_y[0] and box[2] < hi_x[0] and box[3] < hi_y[0]
+
+    def update(self, idx: int, box: Tuple[float, float, float, float]) -> None:
+        if self._axes is not None:
+            for k in range(4):
+                self._axes[k].remove((float(self.aabbs[idx, k]), idx))
+                self._axes[k].add((box[k], idx))
+        self.aabbs[idx] = box
+        if self._axes is None:
+            self._find_holders()
+
+
+def _side_from_bounds(bounds: Tuple[float, float, float, float], scale_factor: float) -> float:
+    return max(bounds[2] - bounds[0], bounds[3] - bounds[1]) / scale_factor
 
 
-def _side_length(states: List[TreeState], scale_factor: float) -> float:
-    bounds = polygons_bounds([s.polygon for s in states])
-    return max(bounds[2] - bounds[0], bounds[3] - bounds[1]) / scale_factor
+def _side_length_from_aabbs(aabbs: np.ndarray, scale_factor: float) -> float:
+    ptp_x = aabbs[:, 2].max() - aabbs[:, 0].min()
+    ptp_y = aabbs[:, 3].max() - aabbs[:, 1].min()
+    return float(max(ptp_x, ptp_y) / scale_factor)
 
 
 def _group_score(side_length: float, n: int) -> float:
     return (side_length * side_length) / n
 
 
-def _dist_sum(states: List[TreeState]) -> float:
-    """Sum of squared distances from origin (for gravity term)."""
-    return sum(s.x * s.x + s.y * s.y for s in states)
-
-
 def _gravity_energy(side_length: float, n: int, dist_sum: float, gravity_weight: float) -> float:
     """Energy with optional gravity compactness term."""
     base_score = (side_length * side_length) / n
@@ -63,26 +208,33 @@ def _gravity_energy(side_length: float, n: int, dist_sum: float, gravity_weight:
     return base_score + effective_gw * normalized_dist
 
 
-def _collides(candidate: Polygon, states: List[TreeState], skip_index: int) -> bool:
+def _collides(
+    candidate: Polygon,
+    polygons: List[Polygon],
+    skip_index: int,
+    aabbs: np.ndarray,
+) -> bool:
     cb = candidate.bounds
-    for i, state in enumerate(states):
-        if i == skip_index:
-            continue
-        sb = state.polygon.bounds
-        if cb[2] < sb[0] or cb[0] > sb[2] or cb[3] < sb[1] or cb[1] > sb[3]:
-            continue
-        if candidate.intersects(state.polygon) and not candidate.touches(state.polygon):
+    mask = ~(
+        (aabbs[:, 2] < cb[0]) | (aabbs[:, 0] > cb[2]) | (aabbs[:, 3] < cb[1]) | (aabbs[:, 1] > cb[3])
+    )
+    mask[skip_index] = False
+    for i in np.flatnonzero(mask).tolist():
+        if candidate.intersects(polygons[i]) and not candidate.touches(polygons[i]):
             return True
     return False
 
 
 def _has_collision(polygons: List[Polygon]) -> bool:
+    # The intersects predicate runs inside the tree query on a prepared
+    # geometry, so only touching-or-overlapping pairs reach Python. Each
+    # pair comes back from both ends; checking it from the lower index is enough.
     tree = STRtree(polygons)
     for i, poly in enumerate(polygons):
-        for idx in tree.query(poly):
-            if idx == i:
+        for idx in tree.query(poly, predicate="intersects"):
+            if idx <= i:
                 continue
-            if poly.intersects(polygons[idx]) and not poly.touches(polygons[idx]):
+            if not poly.touches(polygons[idx]):
                 return True
     return False
 
@@ -103,157 +255,104 @@ class LocalSearchRefiner:
         return states
 
     def refine(self, placements: List[TreePlacement], seed: int) -> Tuple[List[TreePlacement], float]:
+        # Restarts are independent walks from the same placements, each with
+        # its own seed drawn up front, so the result does not depend on the
+        # worker count. Ties keep the earliest restart, as a sequential run would.
         rng = random.Random(seed)
+        tasks = [
+            (self.config, placements, restart, rng.randrange(2**63))
+            for restart in range(self.config.restarts)
+        ]
+        max_workers = min(self.config.restart_workers or os.cpu_count() or 1, len(tasks))
+        if max_workers > 1:
+            with ProcessPoolExecutor(max_workers=max_workers) as executor:
+                results = list(executor.map(_refine_restart, tasks))
+        else:
+            results = list(map(_refine_restart, tasks))
+
         best_placements = placements
         best_score = float("inf")
-        start_time = time.perf_counter()
-
-        for restart in range(self.config.restarts):
-            states = self._init_states(placements)
-            current_side = _side_length(states, self.config.scale_factor)
-            n = len(states)
-            gw = self.config.gravity_weight
-            if gw > 0:
-                current_dist = _dist_sum(states)
-                current_score = _gravity_energy(current_side, n, current_dist, gw)
-            else:
-                current_dist = 0.0
-                current_score = _group_score(current_side, n)
-            print(
-                f"refine restart {restart + 1}/{self.config.restarts} n={len(states)} "
-                f"score={current_score:.6f}",
-                flush=True,
-            )
-
-            if current_score < best_score:
-                best_score = current_score
-                best_placements = [
-                    TreePlacement(x=s.x, y=s.y, deg=s.deg) for s in states
-                ]
-
-            for step in range(self.config.steps):
-                t = step / max(1, self.config.steps - 1)
-                temp = self.config.temp_start * (1.0 - t) + self.config.temp_end * t
-
-                move_pick = rng.random()
-                if self.config.scale_prob > 0.0 and move_pick < self.config.scale_prob:
-                    bounds = polygons_bounds([s.polygon for s in states])
-                    cx = (bounds[0] + bounds[2]) / 2.0 / self.config.scale_factor
-                    cy = (bounds[1] + bounds[3]) / 2.0 / self.config.scale_factor
-                    scale = 1.0 - rng.uniform(0.0, self.config.scale_radius) * temp
-                    candidate_states: List[TreeState] = []
-                    for s in states:
-                        nx = _clamp(cx + (s.x - cx) * scale, -self.config.bounds, self.config.bounds)
-                        ny = _clamp(cy + (s.y - cy) * scale, -self.config.bounds, self.config.bounds)
-                        candidate_states.append(
-                            TreeState(
-                                x=nx,
-                                y=ny,
-                                deg=s.deg,
-                                polygon=build_tree_polygon(nx, ny, s.deg, self.config.scale_factor),
-                            )
-                        )
-                    if _has_collision([s.polygon for s in candidate_states]):
-                        continue
-                    new_side = _side_length(candidate_states, self.config.scale_factor)
-                    if gw > 0:
-                        new_dist = _dist_sum(candidate_states)
-                        new_score = _gravity_energy(new_side, n, new_dist, gw)
-                    else:
-                        new_score = _group_score(new_side, n)
-                    accept = new_score <= current_score
-                    if not accept:
-                        delta = current_score - new_score
-                        accept = rng.random() < math.exp(delta / max(temp, 1e-6))
-                    if accept:
-                        states = candidate_states
-                        current_score = new_score
-                        current_side = new_side
-                        if gw > 0:
-                            current_dist = new_dist
-                        real_score = _group_score(current_side, n)
-                        if real_score < best_score:
-                            best_score = real_score
-                            best_placements = [
-                                TreePlacement(x=s.x, y=s.y, deg=s.deg) for s in states
-                            ]
-                    continue
-
-                if (
-                    self.config.swap_prob > 0.0
-                    and len(states) > 1
-                    and move_pick < self.config.scale_prob + self.config.swap_prob
-                ):
-                    i, j = rng.sample(range(len(states)), 2)
-                    si = states[i]
-                    sj = states[j]
-                    cand_i = build_tree_polygon(sj.x, sj.y, si.deg, self.config.scale_factor)
-                    cand_j = build_tree_polygon(si.x, si.y, sj.deg, self.config.scale_factor)
-                    if _collides(cand_i, states, i) or _collides(cand_j, states, j):
-                        continue
-                    old_i = states[i]
-                    old_j = states[j]
-                    states[i] = TreeState(x=sj.x, y=sj.y, deg=si.deg, polygon=cand_i)
-                    states[j] = TreeState(x=si.x, y=si.y, deg=sj.deg, polygon=cand_j)
-                    new_side = _side_length(states, self.config.scale_factor)
-                    if gw > 0:
-                        new_dist = _dist_sum(states)
-                        new_score = _gravity_energy(new_side, n, new_dist, gw)
-                    else:
-                        new_score = _group_score(new_side, n)
-                    accept = new_score <= current_score
-                    if not accept:
-                        delta = current_score - new_score
-                        accept = rng.random() < math.exp(delta / max(temp, 1e-6))
-                    if accept:
-                        current_score = new_score
-                        current_side = new_side
-                        if gw > 0:
-                            current_dist = new_dist
-                        real_score = _group_score(current_side, n)
-                        if real_score < best_score:
-                            best_score = real_score
-                            best_placements = [
-                                TreePlacement(x=s.x, y=s.y, deg=s.deg) for s in states
-                            ]
-                    else:
-                        states[i] = old_i
-                        states[j] = old_j
-                    continue
-
-                idx = rng.randrange(len(states))
-                state = states[idx]
-
-                move_scale = self.config.move_radius * temp
-                angle_scale = self.config.angle_radius * temp
-
-                dx = rng.uniform(-move_scale, move_scale)
-                dy = rng.uniform(-move_scale, move_scale)
-                ddeg = rng.uniform(-angle_scale, angle_scale)
+        for restart_placements, restart_score in results:
+            if restart_score < best_score:
+                best_placements = restart_placements
+                best_score = restart_score
+        return best_placements, best_score
 
-                nx = _clamp(state.x + dx, -self.config.bounds, self.config.bounds)
-                ny = _clamp(state.y + dy, -self.config.bounds, self.config.bounds)
-                ndeg = (state.deg + ddeg) % 360.0
+    def _restart(
+        self, placements: List[TreePlacement], restart: int, seed: int
+    ) -> Tuple[List[TreePlacement], float]:
+        best_placements = placements
+        best_score = float("inf")
+        start_time = time.perf_counter()
 
-                candidate = build_tree_polygon(nx, ny, ndeg, self.config.scale_factor)
-                if _collides(candidate, states, idx):
+        sf = self.config.scale_factor
+        limit = self.config.bounds
+        quantum = self.config.angle_quantum
+
+        trees = TreeStateArray.from_states(self._init_states(placements))
+        tracker = _AabbTracker(trees.aabbs())
+        current_side = _side_from_bounds(tracker.bounds(), sf)
+        n = len(trees)
+        gw = self.config.gravity_weight
+        if gw > 0:
+            current_dist = trees.dist_sum()
+            current_score = _gravity_energy(current_side, n, current_dist, gw)
+        else:
+            current_dist = 0.0
+            current_score = _group_score(current_side, n)
+        print(
+            f"refine restart {restart + 1}/{self.config.restarts} n={n} "
+            f"score={current_score:.6f}",
+            flush=True,
+        )
+
+        if current_score < best_score:
+            best_score = current_score
+            best_placements = trees.to_placements()
+
+        # Every random number the walk can use is drawn up front in bulk;
+        # each step reads its own slot whichever move it ends up making.
+        steps = self.config.steps
+        rng = np.random.default_rng(seed)
+        picks = rng.random(steps).tolist()
+        firsts = rng.integers(n, size=steps).tolist()
+        seconds = rng.integers(max(1, n - 1), size=steps).tolist()
+        jitters = rng.uniform(-1.0, 1.0, size=(steps, 3)).tolist()
+        shrinks = rng.random(steps).tolist()
+        accept_us = rng.random(steps).tolist()
+
+        for step in range(steps):
+            t = step / max(1, steps - 1)
+            temp = self.config.temp_start * (1.0 - t) + self.config.temp_end * t
+
+            move_pick = picks[step]
+            if self.config.scale_prob > 0.0 and move_pick < self.config.scale_prob:
+                bounds = tracker.bounds()
+                cx = (bounds[0] + bounds[2]) / 2.0 / sf
+                cy = (bounds[1] + bounds[3]) / 2.0 / sf
+                scale = 1.0 - shrinks[step] * self.config.scale_radius * temp
+                new_xs = np.clip(cx + (trees.xs - cx) * scale, -limit, limit)
+                new_ys = np.clip(cy + (trees.ys - cy) * scale, -limit, limit)
+                new_polygons = build_tree_polygons(
+                    tree_vertex_stack(trees.degs.tolist(), sf), new_xs, new_ys, sf
+                )
+                if _has_collision(new_polygons):
                     continue
-
-                old_state = states[idx]
-                states[idx] = TreeState(x=nx, y=ny, deg=ndeg, polygon=candidate)
-                new_side = _side_length(states, self.config.scale_factor)
+                candidate = TreeStateArray(new_xs, new_ys, trees.degs, list(new_polygons))
+                candidate_aabbs = shapely.bounds(new_polygons)
+                new_side = _side_length_from_aabbs(candidate_aabbs, sf)
                 if gw > 0:
-                    new_dist = _dist_sum(states)
+                    new_dist = candidate.dist_sum()
                     new_score = _gravity_energy(new_side, n, new_dist, gw)
                 else:
                     new_score = _group_score(new_side, n)
-
                 accept = new_score <= current_score
                 if not accept:
                     delta = current_score - new_score
-                    accept = rng.random() < math.exp(delta / max(temp, 1e-6))
-
+                    accept = accept_us[step] < math.exp(delta / max(temp, 1e-6))
                 if accept:
+                    trees = candidate
+                    tracker = _AabbTracker(candidate_aabbs)
                     current_score = new_score
                     current_side = new_side
                     if gw > 0:
@@ -261,27 +360,138 @@ class LocalSearchRefiner:
                     real_score = _group_score(current_side, n)
                     if real_score < best_score:
                         best_score = real_score
-                        best_placements = [
-                            TreePlacement(x=s.x, y=s.y, deg=s.deg) for s in states
-                        ]
+                        best_placements = trees.to_placements()
+                continue
+
+            if (
+                self.config.swap_prob > 0.0
+                and n > 1
+                and move_pick < self.config.scale_prob + self.config.swap_prob
+            ):
+                # Swapping exchanges positions; each tree keeps its angle.
+                i = firsts[step]
+                j = seconds[step]
+                if j >= i:
+                    j += 1
+                xi, yi = float(trees.xs[i]), float(trees.ys[i])
+                xj, yj = float(trees.xs[j]), float(trees.ys[j])
+                cand_i = build_tree_polygon(xj, yj, trees.degs[i], sf)
+                cand_j = build_tree_polygon(xi, yi, trees.degs[j], sf)
+                if _collides(cand_i, trees.polygons, i, tracker.aabbs) or _collides(
+                    cand_j, trees.polygons, j, tracker.aabbs
+                ):
+                    continue
+                old_poly_i = trees.polygons[i]
+                old_poly_j = trees.polygons[j]
+                trees.xs[i], trees.ys[i], trees.polygons[i] = xj, yj, cand_i
+                trees.xs[j], trees.ys[j], trees.polygons[j] = xi, yi, cand_j
+                tracker.update(i, cand_i.bounds)
+                tracker.update(j, cand_j.bounds)
+                new_side = _side_from_bounds(tracker.bounds(), sf)
+                if gw > 0:
+                    # The same two positions stay occupied, so the distance
+                    # sum is unchanged.
+                    new_score = _gravity_energy(new_side, n, current_dist, gw)
                 else:
-                    states[idx] = old_state
-
-                if self.config.log_every_steps and step > 0:
-                    if step % self.config.log_every_steps == 0:
-                        elapsed = time.perf_counter() - start_time
-                        print(
-                            f"refine step={step} restart={restart + 1} "
-                            f"current={current_score:.6f} best={best_score:.6f} "
-                            f"time_s={elapsed:.1f}",
-                            flush=True,
-                        )
-
-            elapsed = time.perf_counter() - start_time
-            print(
-                f"refine restart {restart + 1} done best={best_score:.6f} "
-                f"time_s={elapsed:.1f}",
-                flush=True,
-            )
+                    new_score = _group_score(new_side, n)
+                accept = new_score <= current_score
+                if not accept:
+                    delta = current_score - new_score
+                    accept = accept_us[step] < math.exp(delta / max(temp, 1e-6))
+                if accept:
+                    current_score = new_score
+                    current_side = new_side
+                    real_score = _group_score(current_side, n)
+                    if real_score < best_score:
+                        best_score = real_score
+                        best_placements = trees.to_placements()
+                else:
+                    trees.xs[i], trees.ys[i], trees.polygons[i] = xi, yi, old_poly_i
+                    trees.xs[j], trees.ys[j], trees.polygons[j] = xj, yj, old_poly_j
+                    tracker.update(i, old_poly_i.bounds)
+                    tracker.update(j, old_poly_j.bounds)
+                continue
+
+            # The scalar proposal/Metropolis math below is a few microseconds;
+            # a step is dominated by building the candidate polygon and the
+            # GEOS collision test, so JIT-compiling this part alone (with
+            # collisions still in Shapely) would not move the step time.
+            idx = firsts[step]
+            x = float(trees.xs[idx])
+            y = float(trees.ys[idx])
+            deg = float(trees.degs[idx])
+
+            move_scale = self.config.move_radius * temp
+            angle_scale = self.config.angle_radius * temp
+
+            jx, jy, jdeg = jitters[step]
+            dx = jx * move_scale
+            dy = jy * move_scale
+            ddeg = jdeg * angle_scale
+
+            nx = _clamp(x + dx, -limit, limit)
+            ny = _clamp(y + dy, -limit, limit)
+            ndeg = (deg + ddeg) % 360.0
+            if quantum > 0.0:
+                ndeg = (round(ndeg / quantum) * quantum) % 360.0
+
+            candidate = build_tree_polygon(nx, ny, ndeg, sf)
+            if _collides(candidate, trees.polygons, idx, tracker.aabbs):
+                continue
+
+            candidate_box = candidate.bounds
+            if tracker.keeps_bounds(idx, candidate_box):
+                new_side = current_side
+            else:
+                new_side = _side_from_bounds(tracker.bounds_with(idx, candidate_box), sf)
+            if gw > 0:
+                new_dist = current_dist - (x * x + y * y) + (nx * nx + ny * ny)
+                new_score = _gravity_energy(new_side, n, new_dist, gw)
+            else:
+                new_score = _group_score(new_side, n)
+
+            accept = new_score <= current_score
+            if not accept:
+                delta = current_score - new_score
+                accept = accept_us[step] < math.exp(delta / max(temp, 1e-6))
+
+            if accept:
+                tracker.update(idx, candidate_box)
+                trees.xs[idx] = nx
+                trees.ys[idx] = ny
+                trees.degs[idx] = ndeg
+                trees.polygons[idx] = candidate
+                current_score = new_score
+                current_side = new_side
+                if gw > 0:
+                    current_dist = new_dist
+                real_score = _group_score(current_side, n)
+                if real_score < best_score:
+                    best_score = real_score
+                    best_placements = trees.to_placements()
+
+            if self.config.log_every_steps and step > 0:
+                if step % self.config.log_every_steps == 0:
+                    elapsed = time.perf_counter() - start_time
+                    print(
+                        f"refine step={step} restart={restart + 1} "
+                        f"current={current_score:.6f} best={best_score:.6f} "
+                        f"time_s={elapsed:.1f}",
+                        flush=True,
+                    )
+
+        elapsed = time.perf_counter() - start_time
+        print(
+            f"refine restart {restart + 1} done best={best_score:.6f} "
+            f"time_s={elapsed:.1f}",
+            flush=True,
+        )
 
         return best_placements, best_score
+
+
+def _refine_restart(
+    task: Tuple[LocalSearchConfig, List[TreePlacement], int, int]
+) -> Tuple[List[TreePlacement], float]:
+    config, placements, restart, seed = task
+    return LocalSearchRefiner(config)._restart(placements, restart, seed)
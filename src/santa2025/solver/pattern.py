@@ -5,10 +5,18 @@ import random
 from dataclasses import dataclass, field
 from typing import Dict, List, Tuple
 
-from shapely.strtree import STRtree
+import numpy as np
+import shapely
 
-from santa2025.geometry import build_tree_polygon
+from santa2025.geometry import build_tree_polygon, build_tree_polygons, tree_vertex_stack
 from santa2025.io import TreePlacement
+from santa2025.solver._layout import (
+    angle_boxes,
+    angle_id,
+    has_collision,
+    score_and_bounds,
+    square_search,
+)
 
 
 def _overlaps(poly_a, poly_b) -> bool:
@@ -55,7 +63,12 @@ class PatternSolver:
     def __init__(self, config: PatternConfig) -> None:
         self.config = config
         self._angle_bounds = self._build_angle_bounds()
+        self._angle_index: Dict[float, int] = {}
+        self._angle_lut = np.empty((0, 4), dtype=np.float64)
+        for angle in self._angle_bounds:
+            self._angle_id(angle)
         self._patterns = self._build_patterns()
+        self._grid_cache: Dict[Tuple[bool, int, int, PatternSpec], List[TreePlacement]] = {}
 
     def _build_angle_bounds(self) -> Dict[float, Tuple[float, float, float, float]]:
         angles = set()
@@ -77,6 +90,18 @@ class PatternSolver:
         self._angle_bounds[angle] = bounds
         return bounds
 
+    def _angle_id(self, angle: float) -> int:
+        idx, self._angle_lut = angle_id(
+            self._angle_index, self._angle_lut, angle, self._bounds_for_angle
+        )
+        return idx
+
+    def _angle_boxes(self, placements: List[TreePlacement]) -> np.ndarray:
+        boxes, self._angle_lut = angle_boxes(
+            self._angle_index, self._angle_lut, [p.deg for p in placements], self._bounds_for_angle
+        )
+        return boxes
+
     def _min_dx(self, angle_a: float, angle_b: float) -> float | None:
         lo = self.config.dx_min
         hi = self.config.dx_max
@@ -103,24 +128,46 @@ class PatternSolver:
         angle_a: float,
         angle_b: float,
     ) -> bool:
-        polys = []
-        for r in range(self.config.grid_size):
-            y = r * dy
-            row_offset = (r % 2) * offset
-            for c in range(self.config.grid_size):
-                x = c * dx + row_offset
-                angle = angle_a if ((r + c) % 2 == 0) else angle_b
-                polys.append(
-                    build_tree_polygon(x, y, angle, self.config.collision_scale)
-                )
-        tree = STRtree(polys)
-        for i, poly in enumerate(polys):
-            for idx in tree.query(poly):
-                if idx == i:
-                    continue
-                if _overlaps(poly, polys[idx]):
-                    return True
-        return False
+        # Every tree is a translate of one of two outlines, so each box is the
+        # outline's box plus the offset (the same values Polygon.bounds gives).
+        # Only pairs whose boxes meet are tested, as STRtree would, with the
+        # predicates vectorized over all of them at once.
+        # The surviving pairs stay on GEOS: the bisections converge onto
+        # touching spacings, and configs run with spacing_margin 1.0, so the
+        # overlap test has to agree with the one metric.py uses.
+        size = self.config.grid_size
+        scale = self.config.collision_scale
+        r, c = np.divmod(np.arange(size * size), size)
+        xs = c * dx + (r % 2) * offset
+        ys = r * dy
+        is_a = (r + c) % 2 == 0
+        box_a = build_tree_polygon(0.0, 0.0, angle_a, scale).bounds
+        box_b = build_tree_polygon(0.0, 0.0, angle_b, scale).bounds
+        outline = np.where(is_a[:, None], box_a, box_b)
+        ox = xs * scale
+        oy = ys * scale
+        x0 = outline[:, 0] + ox
+        y0 = outline[:, 1] + oy
+        x1 = outline[:, 2] + ox
+        y1 = outline[:, 3] + oy
+        meets = (
+            (x0[:, None] <= x1[None, :])
+            & (x0[None, :] <= x1[:, None])
+            & (y0[:, None] <= y1[None, :])
+            & (y0[None, :] <= y1[:, None])
+        )
+        pairs_i, pairs_j = np.nonzero(np.triu(meets, k=1))
+        if pairs_i.size == 0:
+            return False
+
+        angles = np.where(is_a, angle_a, angle_b)
+        polys = build_tree_polygons(tree_vertex_stack(angles.tolist(), scale), xs, ys, scale)
+        first = polys[pairs_i]
+        second = polys[pairs_j]
+        hit = shapely.intersects(first, second)
+        if not hit.any():
+            return False
+        return bool((~shapely.touches(first[hit], second[hit])).any())
 
     def _min_dy(
         self, dx: float, offset: float, angle_a: float, angle_b: float
@@ -217,6 +264,19 @@ class PatternSolver:
                 placements.append(TreePlacement(x=x, y=y + yj, deg=angle))
         return placements
 
+    def _fixed_grid(
+        self, rows: int, cols: int, spec: PatternSpec, centered: bool
+    ) -> List[TreePlacement]:
+        # Unjittered grids depend only on their shape, and neighbouring n ask
+        # for the same ones; callers slice or sort, never mutate, the result.
+        key = (centered, rows, cols, spec)
+        grid = self._grid_cache.get(key)
+        if grid is None:
+            build = self._grid_placements_centered if centered else self._grid_placements
+            grid = build(rows, cols, spec, None)
+            self._grid_cache[key] = grid
+        return grid
+
     def _select_centered(self, placements: List[TreePlacement], n: int) -> List[TreePlacement]:
         def key(p: TreePlacement) -> tuple[float, float]:
             return (max(abs(p.x), abs(p.y)), abs(p.x) + abs(p.y))
@@ -230,22 +290,10 @@ class PatternSolver:
             for p in placements
         ]
 
-    def _build_polygons(self, placements: List[TreePlacement]):
-        return [
-            build_tree_polygon(p.x, p.y, p.deg, self.config.scale_factor)
-            for p in placements
-        ]
-
     def _has_collision(self, placements: List[TreePlacement]) -> bool:
-        polys = self._build_polygons(placements)
-        tree = STRtree(polys)
-        for i, poly in enumerate(polys):
-            for idx in tree.query(poly):
-                if idx == i:
-                    continue
-                if _overlaps(poly, polys[idx]):
-                    return True
-        return False
+        xs = np.array([p.x for p in placements], dtype=np.float64)
+        ys = np.array([p.y for p in placements], dtype=np.float64)
+        return has_collision(xs, ys, [p.deg for p in placements], self.config.scale_factor)
 
     def _global_squeeze(self, placements: List[TreePlacement]) -> List[TreePlacement]:
         if not self.config.global_squeeze:
@@ -279,17 +327,10 @@ class PatternSolver:
         return self._scale(placements, high)
 
     def _score_and_bounds(self, placements: List[TreePlacement]) -> Tuple[float, Tuple[float, float, float, float]]:
-        minx = miny = float("inf")
-        maxx = maxy = float("-inf")
-        for p in placements:
-            bx0, by0, bx1, by1 = self._bounds_for_angle(p.deg)
-            minx = min(minx, p.x + bx0)
-            miny = min(miny, p.y + by0)
-            maxx = max(maxx, p.x + bx1)
-            maxy = max(maxy, p.y + by1)
-        side = max(maxx - minx, maxy - miny)
-        score = (side * side) / len(placements)
-        return score, (minx, miny, maxx, maxy)
+        count = len(placements)
+        xs = np.fromiter((p.x for p in placements), dtype=np.float64, count=count)
+        ys = np.fromiter((p.y for p in placements), dtype=np.float64, count=count)
+        return score_and_bounds(xs, ys, self._angle_boxes(placements))
 
     def _center(self, placements: List[TreePlacement], bounds: Tuple[float, float, float, float]) -> List[TreePlacement]:
         minx, miny, maxx, maxy = bounds
@@ -305,30 +346,16 @@ class PatternSolver:
         placements: List[TreePlacement],
         n: int,
         spec: PatternSpec,
-    ) -> List[TreePlacement]:
-        steps = max(1, int(self.config.center_steps))
-        offsets_x = [spec.dx * (i / steps) for i in range(steps)]
-        offsets_y = [spec.dy * (i / steps) for i in range(steps)]
-
-        best_layout: List[TreePlacement] = []
-        best_score = float("inf")
-
-        for cx in offsets_x:
-            for cy in offsets_y:
-                ranked: List[Tuple[float, TreePlacement]] = []
-                for p in placements:
-                    bx0, by0, bx1, by1 = self._bounds_for_angle(p.deg)
-                    hx = max(abs(p.x + bx0 - cx), abs(p.x + bx1 - cx))
-                    hy = max(abs(p.y + by0 - cy), abs(p.y + by1 - cy))
-                    ranked.append((max(hx, hy), p))
-                ranked.sort(key=lambda t: t[0])
-                chosen = [p for _, p in ranked[:n]]
-                score, _ = self._score_and_bounds(chosen)
-                if score < best_score:
-                    best_score = score
-                    best_layout = chosen
-
-        return best_layout
+    ) -> Tuple[List[TreePlacement], float, Tuple[float, float, float, float]]:
+        count = len(placements)
+        xs = np.fromiter((p.x for p in placements), dtype=np.float64, count=count)
+        ys = np.fromiter((p.y for p in placements), dtype=np.float64, count=count)
+        extents = self._angle_boxes(placements) + np.column_stack((xs, ys, xs, ys))
+        order, bounds = square_search(extents, n, spec.dx, spec.dy, self.config.center_steps)
+        minx, miny, maxx, maxy = bounds
+        side = max(maxx - minx, maxy - miny)
+        score = (side * side) / order.size
+        return [placements[i] for i in order.tolist()], score, bounds
 
     def _best_layout(self, n: int, spec: PatternSpec, rng: random.Random) -> List[TreePlacement]:
         max_rows = int(math.ceil(math.sqrt(n))) + self.config.rows_pad
@@ -339,12 +366,8 @@ class PatternSolver:
         if self.config.selection_mode == "square_search":
             rows = max_rows + int(self.config.search_pad)
             cols = rows
-            placements = self._grid_placements_centered(rows, cols, spec, None)
-            placements = self._square_search(placements, n, spec)
-            score, bounds = self._score_and_bounds(placements)
-            best_score = score
-            best_layout = placements
-            best_bounds = bounds
+            placements = self._fixed_grid(rows, cols, spec, centered=True)
+            best_layout, best_score, best_bounds = self._square_search(placements, n, spec)
         else:
             for rows in range(1, max_rows + 1):
                 cols = int(math.ceil(n / rows))
@@ -352,21 +375,23 @@ class PatternSolver:
                     placements = self._grid_placements_centered(rows, cols, spec, rng)
                     placements = self._select_centered(placements, n)
                     if self.config.jitter and self._has_collision(placements):
-                        placements = self._grid_placements_centered(rows, cols, spec, None)
+                        placements = self._fixed_grid(rows, cols, spec, centered=True)
                         placements = self._select_centered(placements, n)
                 else:
                     placements = self._grid_placements(rows, cols, spec, rng)[:n]
                     if self.config.jitter and self._has_collision(placements):
-                        placements = self._grid_placements(rows, cols, spec, None)[:n]
+                        placements = self._fixed_grid(rows, cols, spec, centered=False)[:n]
                 score, bounds = self._score_and_bounds(placements)
                 if score < best_score:
                     best_score = score
                     best_layout = placements
                     best_bounds = bounds
 
-        best_layout = self._global_squeeze(best_layout)
-        _, bounds = self._score_and_bounds(best_layout)
-        return self._center(best_layout, bounds)
+        squeezed = self._global_squeeze(best_layout)
+        if squeezed is not best_layout:
+            # A squeeze moves the trees, so the selection bounds no longer hold.
+            _, best_bounds = self._score_and_bounds(squeezed)
+        return self._center(squeezed, best_bounds)
 
     def solve(self, n_max: int, seed: int = 0) -> Dict[int, List[TreePlacement]]:
         groups: Dict[int, List[TreePlacement]] = {}
@@ -1,17 +1,22 @@
 from __future__ import annotations
 
 import math
+import os
+from concurrent.futures import ProcessPoolExecutor
 from dataclasses import dataclass, field
-from typing import List, Tuple
+from typing import Callable, List, Tuple
 
-from shapely.strtree import STRtree
+import numpy as np
 
-from santa2025.geometry import build_tree_polygon
+from santa2025.geometry import tree_outline_bounds
 from santa2025.io import TreePlacement
-
-
-def _overlaps(poly_a, poly_b) -> bool:
-    return poly_a.intersects(poly_b) and not poly_a.touches(poly_b)
+from santa2025.solver._layout import (
+    angle_boxes,
+    angle_id,
+    has_collision,
+    score_and_bounds,
+    square_search,
+)
 
 
 @dataclass(frozen=True)
@@ -38,6 +43,7 @@ class PeriodicConfig:
     squeeze_factor: float = 0.985
     squeeze_steps: int = 20
     squeeze_iters: int = 8
+    max_workers: int = 1  # Processes for solve/score_total over n; 0 uses all CPUs
 
 
 class PeriodicSolver:
@@ -45,136 +51,96 @@ class PeriodicSolver:
         if not config.basis:
             raise ValueError("PeriodicConfig requires a non-empty basis.")
         self.config = config
-        self._angle_bounds = self._build_angle_bounds()
-
-    def _build_angle_bounds(self) -> dict[float, Tuple[float, float, float, float]]:
-        bounds: dict[float, Tuple[float, float, float, float]] = {}
-        for b in self.config.basis:
-            angle = float(b.deg) % 360.0
-            if angle in bounds:
-                continue
-            poly = build_tree_polygon(0.0, 0.0, angle, 1.0)
-            bounds[angle] = poly.bounds
-        return bounds
+        self._angle_index: dict[float, int] = {}
+        self._angle_lut = np.empty((0, 4), dtype=np.float64)
+        for b in config.basis:
+            self._angle_id(b.deg)
+        self._tile_cache: dict[
+            int, Tuple[np.ndarray, np.ndarray, List[float], np.ndarray, np.ndarray]
+        ] = {}
 
     def _bounds_for_angle(self, angle: float) -> Tuple[float, float, float, float]:
-        angle = float(angle) % 360.0
-        cached = self._angle_bounds.get(angle)
-        if cached is not None:
-            return cached
-        poly = build_tree_polygon(0.0, 0.0, angle, 1.0)
-        bounds = poly.bounds
-        self._angle_bounds[angle] = bounds
-        return bounds
+        return tree_outline_bounds(float(angle) % 360.0)
+
+    def _angle_id(self, angle: float) -> int:
+        idx, self._angle_lut = angle_id(
+            self._angle_index, self._angle_lut, angle, self._bounds_for_angle
+        )
+        return idx
+
+    def _angle_boxes(self, placements: List[TreePlacement]) -> np.ndarray:
+        boxes, self._angle_lut = angle_boxes(
+            self._angle_index, self._angle_lut, [p.deg for p in placements], self._bounds_for_angle
+        )
+        return boxes
 
     def _score_and_bounds(
         self, placements: List[TreePlacement]
     ) -> Tuple[float, Tuple[float, float, float, float]]:
-        minx = miny = float("inf")
-        maxx = maxy = float("-inf")
-        for p in placements:
-            bx0, by0, bx1, by1 = self._bounds_for_angle(p.deg)
-            minx = min(minx, p.x + bx0)
-            miny = min(miny, p.y + by0)
-            maxx = max(maxx, p.x + bx1)
-            maxy = max(maxy, p.y + by1)
-        side = max(maxx - minx, maxy - miny)
-        score = (side * side) / len(placements)
-        return score, (minx, miny, maxx, maxy)
-
-    def _center(
-        self, placements: List[TreePlacement], bounds: Tuple[float, float, float, float]
-    ) -> List[TreePlacement]:
-        minx, miny, maxx, maxy = bounds
-        cx = (minx + maxx) / 2.0
-        cy = (miny + maxy) / 2.0
-        return [TreePlacement(x=p.x - cx, y=p.y - cy, deg=p.deg) for p in placements]
-
-    def _tile_points(self, n: int) -> List[TreePlacement]:
+        count = len(placements)
+        xs = np.fromiter((p.x for p in placements), dtype=np.float64, count=count)
+        ys = np.fromiter((p.y for p in placements), dtype=np.float64, count=count)
+        return score_and_bounds(xs, ys, self._angle_boxes(placements))
+
+    def _tile_points(self, side_cells: int) -> Tuple[np.ndarray, np.ndarray]:
+        # Tree centres for every lattice cell as flat x/y arrays, ordered
+        # by row j, then column i, then basis tree.
         dx = self.config.dx
         dy = self.config.dy
         offset = self.config.offset
         basis = self.config.basis
         angle_deg = float(self.config.lattice_angle_deg)
-        angle_rad = math.radians(angle_deg)
-        cos_a = math.cos(angle_rad)
-        sin_a = math.sin(angle_rad)
 
+        cells = np.arange(-side_cells, side_cells + 1, dtype=np.float64)
+        tx = cells[None, :] * dx + cells[:, None] * offset
+        ty = np.broadcast_to((cells * dy)[:, None], tx.shape)
+        bx = np.array([b.x for b in basis], dtype=np.float64)
+        by = np.array([b.y for b in basis], dtype=np.float64)
+        xs = (bx + tx[:, :, None]).ravel()
+        ys = (by + ty[:, :, None]).ravel()
+        if angle_deg:
+            angle_rad = math.radians(angle_deg)
+            cos_a = math.cos(angle_rad)
+            sin_a = math.sin(angle_rad)
+            xs, ys = xs * cos_a - ys * sin_a, xs * sin_a + ys * cos_a
+        return xs, ys
+
+    def _tiles(
+        self, n: int
+    ) -> Tuple[np.ndarray, np.ndarray, List[float], np.ndarray, np.ndarray]:
+        # The lattice only grows with side_cells, which many consecutive n
+        # share, so it is built once per size, kept as x/y arrays, angles,
+        # (N, 4) outline boxes and the boxes placed at each tile (minx,
+        # miny, maxx, maxy). Callers never mutate any of them.
+        basis = self.config.basis
         per_cell = len(basis)
         side_cells = int(math.ceil(math.sqrt(max(1, n / per_cell)))) + self.config.search_pad
-
-        placements: List[TreePlacement] = []
-        for j in range(-side_cells, side_cells + 1):
-            for i in range(-side_cells, side_cells + 1):
-                tx = i * dx + j * offset
-                ty = j * dy
-                for b in basis:
-                    x = b.x + tx
-                    y = b.y + ty
-                    if angle_deg:
-                        xr = x * cos_a - y * sin_a
-                        yr = x * sin_a + y * cos_a
-                        x, y = xr, yr
-                    placements.append(TreePlacement(x=x, y=y, deg=b.deg))
-        return placements
-
-    def _square_search(self, placements: List[TreePlacement], n: int) -> List[TreePlacement]:
-        steps = max(1, int(self.config.center_steps))
-        dx = self.config.dx
-        dy = self.config.dy
-        offsets_x = [dx * (i / steps) for i in range(steps)]
-        offsets_y = [dy * (i / steps) for i in range(steps)]
-
-        best_layout: List[TreePlacement] = []
-        best_score = float("inf")
-
-        for cx in offsets_x:
-            for cy in offsets_y:
-                ranked: List[Tuple[float, TreePlacement]] = []
-                for p in placements:
-                    bx0, by0, bx1, by1 = self._bounds_for_angle(p.deg)
-                    hx = max(abs(p.x + bx0 - cx), abs(p.x + bx1 - cx))
-                    hy = max(abs(p.y + by0 - cy), abs(p.y + by1 - cy))
-                    ranked.append((max(hx, hy), p))
-                ranked.sort(key=lambda t: t[0])
-                chosen = [p for _, p in ranked[:n]]
-                score, _ = self._score_and_bounds(chosen)
-                if score < best_score:
-                    best_score = score
-                    best_layout = chosen
-
-        return best_layout
-
-    def _scale(self, placements: List[TreePlacement], factor: float) -> List[TreePlacement]:
-        return [TreePlacement(x=p.x * factor, y=p.y * factor, deg=p.deg) for p in placements]
-
-    def _has_collision(self, placements: List[TreePlacement]) -> bool:
-        polys = [
-            build_tree_polygon(p.x, p.y, p.deg, self.config.collision_scale)
-            for p in placements
-        ]
-        tree = STRtree(polys)
-        for i, poly in enumerate(polys):
-            for idx in tree.query(poly):
-                if idx == i:
-                    continue
-                if _overlaps(poly, polys[idx]):
-                    return True
-        return False
-
-    def _global_squeeze(self, placements: List[TreePlacement]) -> List[TreePlacement]:
+        cached = self._tile_cache.get(side_cells)
+        if cached is None:
+            xs, ys = self._tile_points(side_cells)
+            cell_count = xs.size // per_cell
+            basis_boxes = self._angle_lut[[self._angle_index[b.deg] for b in basis]]
+            boxes = np.tile(basis_boxes, (cell_count, 1))
+            extents = boxes + np.column_stack((xs, ys, xs, ys))
+            cached = (xs, ys, [b.deg for b in basis] * cell_count, boxes, extents)
+            self._tile_cache[side_cells] = cached
+        return cached
+
+    def _global_squeeze(
+        self, xs: np.ndarray, ys: np.ndarray, degs: List[float]
+    ) -> Tuple[np.ndarray, np.ndarray]:
         if not self.config.global_squeeze:
-            return placements
+            return xs, ys
         factor = self.config.squeeze_factor
         current_scale = 1.0
-        current = placements
+        current = (xs, ys)
         low = None
         high = 1.0
 
         for _ in range(self.config.squeeze_steps):
             next_scale = current_scale * factor
-            scaled = self._scale(placements, next_scale)
-            if self._has_collision(scaled):
+            scaled = (xs * next_scale, ys * next_scale)
+            if has_collision(*scaled, degs, self.config.collision_scale):
                 low = next_scale
                 high = current_scale
                 break
@@ -186,37 +152,74 @@ class PeriodicSolver:
 
         for _ in range(self.config.squeeze_iters):
             mid = (low + high) / 2.0
-            scaled = self._scale(placements, mid)
-            if self._has_collision(scaled):
+            if has_collision(xs * mid, ys * mid, degs, self.config.collision_scale):
                 low = mid
             else:
                 high = mid
-        return self._scale(placements, high)
+        return xs * high, ys * high
 
-    def _best_layout(self, n: int) -> List[TreePlacement]:
-        placements = self._tile_points(n)
+    def _best_arrays(self, n: int) -> Tuple[np.ndarray, np.ndarray, List[float], np.ndarray]:
+        # The whole select/squeeze/centre pipeline runs on x/y arrays;
+        # TreePlacement objects are only built for callers that want them.
+        xs, ys, degs, boxes, extents = self._tiles(n)
+        bounds = None
         if self.config.selection_mode == "square_search":
-            best = self._square_search(placements, n)
+            order, bounds = square_search(
+                extents, n, self.config.dx, self.config.dy, self.config.center_steps
+            )
         else:
-            def key(p: TreePlacement) -> Tuple[float, float]:
-                return (max(abs(p.x), abs(p.y)), abs(p.x) + abs(p.y))
+            ax = np.abs(xs)
+            ay = np.abs(ys)
+            # Stable, like sorted() on the (Chebyshev, Manhattan) key.
+            order = np.lexsort((ax + ay, np.maximum(ax, ay)))[:n]
+        degs = [degs[i] for i in order.tolist()]
+        boxes = boxes[order]
+
+        selected_xs = xs[order]
+        xs, ys = self._global_squeeze(selected_xs, ys[order], degs)
+        if bounds is None or xs is not selected_xs:
+            # A squeeze moves the trees, so the search bounds no longer hold.
+            _, bounds = score_and_bounds(xs, ys, boxes)
+        minx, miny, maxx, maxy = bounds
+        cx = (minx + maxx) / 2.0
+        cy = (miny + maxy) / 2.0
+        return xs - cx, ys - cy, degs, boxes
 
-            best = sorted(placements, key=key)[:n]
+    def _best_layout(self, n: int) -> List[TreePlacement]:
+        xs, ys, degs, _ = self._best_arrays(n)
+        return [
+            TreePlacement(x=x, y=y, deg=deg)
+            for x, y, deg in zip(xs.tolist(), ys.tolist(), degs)
+        ]
 
-        best = self._global_squeeze(best)
-        _, bounds = self._score_and_bounds(best)
-        return self._center(best, bounds)
+    def _best_score(self, n: int) -> float:
+        xs, ys, _, boxes = self._best_arrays(n)
+        return score_and_bounds(xs, ys, boxes)[0]
+
+    def _map_n(self, fn, n_max: int) -> dict:
+        # Every n is independent. Each worker builds one solver for an
+        # interleaved share of n, so it reuses its lattice cache and gets
+        # some of the large, slow n.
+        workers = min(self.config.max_workers or os.cpu_count() or 1, n_max)
+        if workers <= 1:
+            return {n: fn(self, n) for n in range(1, n_max + 1)}
+        tasks = [(self.config, fn, list(range(1 + i, n_max + 1, workers))) for i in range(workers)]
+        with ProcessPoolExecutor(max_workers=workers) as executor:
+            return dict(pair for part in executor.map(_solve_share, tasks) for pair in part)
 
     def solve(self, n_max: int, seed: int = 0) -> dict[int, List[TreePlacement]]:
-        groups: dict[int, List[TreePlacement]] = {}
-        for n in range(1, n_max + 1):
-            groups[n] = self._best_layout(n)
-        return groups
+        solved = self._map_n(PeriodicSolver._best_layout, n_max)
+        return {n: solved[n] for n in range(1, n_max + 1)}
 
     def score_total(self, n_max: int) -> float:
+        scores = self._map_n(PeriodicSolver._best_score, n_max)
         total = 0.0
         for n in range(1, n_max + 1):
-            layout = self._best_layout(n)
-            score, _ = self._score_and_bounds(layout)
-            total += score
+            total += scores[n]
         return total
+
+
+def _solve_share(task: Tuple[PeriodicConfig, Callable, List[int]]) -> List[Tuple[int, object]]:
+    config, fn, ns = task
+    solver = PeriodicSolver(config)
+    return [(n, fn(solver, n)) for n in ns]
@@ -8,30 +8,73 @@ Based on techniques from top public solutions:
 from __future__ import annotations
 
 import math
+from functools import lru_cache
 from typing import List, Tuple
 
 import numpy as np
+import shapely
+from shapely.geometry import Polygon
 
-from santa2025.geometry import build_tree_polygon
+from santa2025.geometry import TREE_POINTS, build_tree_polygon, tree_vertex_stack
 from santa2025.io import TreePlacement
 
 try:
-    from scipy.optimize import minimize_scalar
     from scipy.spatial import ConvexHull
     SCIPY_AVAILABLE = True
 except ImportError:
     SCIPY_AVAILABLE = False
 
-
-def _bbox_side_at_angle(angle_deg: float, points: np.ndarray) -> float:
+try:
+    from numba import njit
+    NUMBA_AVAILABLE = True
+except ImportError:
+    NUMBA_AVAILABLE = False
+
+
+def _bbox_dims_numpy(angle_rad: float, xs: np.ndarray, ys: np.ndarray) -> Tuple[float, float]:
+    """Calculate bounding box width and height after rotating points by angle."""
+    c, s = math.cos(angle_rad), math.sin(angle_rad)
+    rx = xs * c - ys * s
+    ry = xs * s + ys * c
+    return rx.max() - rx.min(), ry.max() - ry.min()
+
+
+if NUMBA_AVAILABLE:
+
+    @njit(cache=True)
+    def _bbox_dims_at_angle(angle_rad: float, xs: np.ndarray, ys: np.ndarray) -> Tuple[float, float]:
+        """Calculate bounding box width and height after rotating points by angle."""
+        # One pass with scalar extremes; the objective is evaluated many
+        # times per group and the NumPy version allocates on every call.
+        c = math.cos(angle_rad)
+        s = math.sin(angle_rad)
+        minx = miny = math.inf
+        maxx = maxy = -math.inf
+        for i in range(xs.size):
+            rx = xs[i] * c - ys[i] * s
+            ry = xs[i] * s + ys[i] * c
+            minx = min(minx, rx)
+            maxx = max(maxx, rx)
+            miny = min(miny, ry)
+            maxy = max(maxy, ry)
+        return maxx - minx, maxy - miny
+
+else:
+    _bbox_dims_at_angle = _bbox_dims_numpy
+
+
+def _bbox_side_at_angle(angle_rad: float, xs: np.ndarray, ys: np.ndarray) -> float:
     """Calculate bounding box side length after rotating points by angle."""
-    angle_rad = np.radians(angle_deg)
-    c, s = np.cos(angle_rad), np.sin(angle_rad)
-    rot_matrix_T = np.array([[c, s], [-s, c]])
-    rotated = points.dot(rot_matrix_T)
-    min_xy = np.min(rotated, axis=0)
-    max_xy = np.max(rotated, axis=0)
-    return max(max_xy[0] - min_xy[0], max_xy[1] - min_xy[1])
+    return max(_bbox_dims_at_angle(angle_rad, xs, ys))
+
+
+@lru_cache(maxsize=1)
+def _outline_hull_rows() -> np.ndarray:
+    """Indices of the outline vertices on the tree's own convex hull."""
+    # Rotating and translating a tree maps its hull onto the new hull, so
+    # only these vertices can reach the group hull or its bounding box.
+    hull = shapely.convex_hull(Polygon(TREE_POINTS))
+    return np.array(sorted(TREE_POINTS.index(c) for c in hull.exterior.coords[:-1]))
 
 
 def _hull_points(points: np.ndarray) -> np.ndarray:
@@ -44,11 +87,14 @@ def _hull_points(points: np.ndarray) -> np.ndarray:
             return points[hull.vertices]
         except Exception:
             pass
+    hull = shapely.convex_hull(shapely.multipoints(points))
+    if hull.geom_type == "Polygon":
+        return np.asarray(hull.exterior.coords)[:-1]
     return points
 
 
 def _edge_angles(points: np.ndarray) -> List[float]:
-    """Get angles from convex hull edges as rotation candidates."""
+    """Get the rotations that turn each convex hull edge onto an axis."""
     angles: set = set()
     if points.shape[0] < 2:
         return [0.0]
@@ -59,7 +105,7 @@ def _edge_angles(points: np.ndarray) -> List[float]:
         dy = y2 - y1
         if abs(dx) < 1e-12 and abs(dy) < 1e-12:
             continue
-        angle = math.degrees(math.atan2(dy, dx)) % 90.0
+        angle = -math.degrees(math.atan2(dy, dx)) % 90.0
         angles.add(angle)
     return sorted(angles) if angles else [0.0]
 
@@ -75,40 +121,63 @@ def optimize_rotation(
     Returns:
         (best_side_length, best_angle_deg)
     """
-    # Collect all polygon points
-    points = []
-    for p in placements:
-        poly = build_tree_polygon(p.x, p.y, p.deg, scale_factor)
-        points.extend(list(poly.exterior.coords))
-    
-    points_np = np.array(points)
-    if points_np.size == 0:
+    if not placements:
         return 0.0, 0.0
+
+    # Points come straight from the cached rotated outlines. Only each
+    # tree's hull vertices (a third of the outline) are needed for the
+    # group hull and every bounding box measured on it.
+    outlines = tree_vertex_stack([p.deg for p in placements], scale_factor)
+    offsets = np.array([(p.x, p.y) for p in placements], dtype=np.float64) * scale_factor
+    points_np = (outlines[:, _outline_hull_rows()] + offsets[:, None, :]).reshape(-1, 2)
     
     hull_pts = _hull_points(points_np)
-    initial_side = _bbox_side_at_angle(0.0, hull_pts)
+    hull_xs = np.ascontiguousarray(hull_pts[:, 0], dtype=np.float64)
+    hull_ys = np.ascontiguousarray(hull_pts[:, 1], dtype=np.float64)
+    initial_side = _bbox_side_at_angle(0.0, hull_xs, hull_ys)
     
-    if SCIPY_AVAILABLE and hull_pts.shape[0] >= 3:
-        # Use scipy optimization
-        res = minimize_scalar(
-            lambda a: _bbox_side_at_angle(a, hull_pts),
-            bounds=(0.001, float(angle_max)),
-            method="bounded",
-        )
-        best_angle = float(res.x)
-        best_side = float(res.fun)
-    else:
-        # Fallback: test edge angles
-        best_angle = 0.0
-        best_side = initial_side
-        for angle in _edge_angles(hull_pts):
-            if angle > angle_max:
-                continue
-            cand = _bbox_side_at_angle(angle, hull_pts)
+    # Width and height are each a single sinusoid of the angle between
+    # consecutive edge directions, and concave there, so the side is
+    # smallest either at an edge angle or where width crosses height. Every
+    # edge angle is tried, then each crossing is bisected; this is the
+    # global minimum rather than a local one from a bounded 1-D search.
+    angles = _edge_angles(hull_pts)
+    dims = [_bbox_dims_at_angle(math.radians(a), hull_xs, hull_ys) for a in angles]
+    gaps = [w - h for w, h in dims]
+    best_angle = 0.0
+    best_side = initial_side
+    for i, angle in enumerate(angles):
+        if angle <= angle_max:
+            cand = max(dims[i])
             if cand < best_side:
                 best_side = cand
                 best_angle = angle
-    
+        # Turning by 90 degrees swaps width and height, so the interval
+        # after the last edge angle wraps round to the first one.
+        if i + 1 < len(angles):
+            lo, hi, gap_hi = angle, angles[i + 1], gaps[i + 1]
+        else:
+            lo, hi, gap_hi = angle, angles[0] + 90.0, -gaps[0]
+        gap_lo = gaps[i]
+        if gap_lo * gap_hi >= 0.0:
+            continue
+        for _ in range(60):
+            if hi - lo <= 1e-12:
+                break
+            mid = (lo + hi) / 2.0
+            w, h = _bbox_dims_at_angle(math.radians(mid), hull_xs, hull_ys)
+            if (w - h) * gap_lo > 0.0:
+                lo = mid
+            else:
+                hi = mid
+        crossing = hi % 90.0
+        if crossing > angle_max:
+            continue
+        cand = _bbox_side_at_angle(math.radians(crossing), hull_xs, hull_ys)
+        if cand < best_side:
+            best_side = cand
+            best_angle = crossing
+
     epsilon_scaled = epsilon * scale_factor
     if initial_side - best_side <= epsilon_scaled:
         return initial_side / scale_factor, 0.0
@@ -124,24 +193,23 @@ def apply_rotation(
         return list(placements)
     
     # Find center
-    xs = [p.x for p in placements]
-    ys = [p.y for p in placements]
-    cx = (min(xs) + max(xs)) / 2.0
-    cy = (min(ys) + max(ys)) / 2.0
+    coords = np.array([(p.x, p.y, p.deg) for p in placements], dtype=np.float64)
+    xs, ys, degs = coords.T
+    cx = (xs.min() + xs.max()) / 2.0
+    cy = (ys.min() + ys.max()) / 2.0
     
     # Rotate
     angle_rad = np.radians(angle_deg)
     c, s = np.cos(angle_rad), np.sin(angle_rad)
-    
-    rotated = []
-    for p in placements:
-        dx = p.x - cx
-        dy = p.y - cy
-        nx = cx + dx * c - dy * s
-        ny = cy + dx * s + dy * c
-        ndeg = (p.deg + angle_deg) % 360.0
-        rotated.append(TreePlacement(x=nx, y=ny, deg=ndeg))
-    return rotated
+    dx = xs - cx
+    dy = ys - cy
+    nx = cx + dx * c - dy * s
+    ny = cy + dx * s + dy * c
+    ndeg = (degs + angle_deg) % 360.0
+    return [
+        TreePlacement(x=x, y=y, deg=deg)
+        for x, y, deg in zip(nx.tolist(), ny.tolist(), ndeg.tolist())
+    ]
 
 
 def fix_direction(
@@ -1,19 +1,50 @@
 from __future__ import annotations
 
 import math
+import os
+from concurrent.futures import ProcessPoolExecutor
 from dataclasses import dataclass, field
-from typing import List, Tuple
-
-from shapely.strtree import STRtree
-
-from santa2025.geometry import build_tree_polygon
+from functools import lru_cache
+from typing import Iterable, List, Optional, Tuple
+
+import numpy as np
+import shapely
+
+from santa2025.geometry import (
+    build_tree_polygon,
+    build_tree_polygons,
+    tree_outline_bounds,
+    tree_vertex_stack,
+)
 from santa2025.io import TreePlacement
+from santa2025.solver._layout import (
+    angle_boxes,
+    angle_id,
+    has_collision,
+    score_and_bounds,
+    square_search,
+)
 
 
 def _overlaps(poly_a, poly_b) -> bool:
     return poly_a.intersects(poly_b) and not poly_a.touches(poly_b)
 
 
+@lru_cache(maxsize=256)
+def _grid_outlines(
+    angles: Tuple[float, ...], scale: float
+) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+    # Rotated outlines of a probe grid and their (min, max) corners. The
+    # spacing bisections rebuild the same grid at every step with only the
+    # translations changing, so this is shared across those calls.
+    stack = tree_vertex_stack(angles, scale)
+    lo = stack.min(axis=1)
+    hi = stack.max(axis=1)
+    for arr in (stack, lo, hi):
+        arr.flags.writeable = False
+    return stack, lo, hi
+
+
 @dataclass(frozen=True)
 class RowPatternSpec:
     angles: List[float]
@@ -35,27 +66,67 @@ class RowPatternConfig:
     squeeze_factor: float = 0.985
     squeeze_steps: int = 20
     squeeze_iters: int = 8
+    bisect_tol: float = 1e-9
+    max_workers: int = 1  # Processes for solve over n; 0 uses all CPUs
 
 
 class RowPatternSolver:
     def __init__(self, config: RowPatternConfig) -> None:
         self.config = config
-        self._angle_bounds = {}
+        self._angle_index: dict[float, int] = {}
+        self._angle_lut = np.empty((0, 4), dtype=np.float64)
 
     def _bounds_for_angle(self, angle: float) -> Tuple[float, float, float, float]:
-        angle = float(angle) % 360.0
-        cached = self._angle_bounds.get(angle)
-        if cached is not None:
-            return cached
-        poly = build_tree_polygon(0.0, 0.0, angle, 1.0)
-        bounds = poly.bounds
-        self._angle_bounds[angle] = bounds
-        return bounds
-
-    def _row_collision(self, angle: float, dx: float) -> bool:
-        poly_a = build_tree_polygon(0.0, 0.0, angle, self.config.collision_scale)
-        poly_b = build_tree_polygon(dx, 0.0, angle, self.config.collision_scale)
-        return _overlaps(poly_a, poly_b)
+        return tree_outline_bounds(float(angle) % 360.0)
+
+    def _angle_id(self, angle: float) -> int:
+        idx, self._angle_lut = angle_id(
+            self._angle_index, self._angle_lut, angle, self._bounds_for_angle
+        )
+        return idx
+
+    def _angle_boxes(self, placements: List[TreePlacement]) -> np.ndarray:
+        boxes, self._angle_lut = angle_boxes(
+            self._angle_index, self._angle_lut, [p.deg for p in placements], self._bounds_for_angle
+        )
+        return boxes
+
+    def _row_collision(self, base, angle: float, dx: float) -> bool:
+        other = build_tree_polygon(dx, 0.0, angle, self.config.collision_scale)
+        return _overlaps(base, other)
+
+    def _any_overlap(self, xs: np.ndarray, ys: np.ndarray, angles: Tuple[float, ...]) -> bool:
+        # Each tree is a translate of its rotated outline, so its box is the
+        # outline's box plus the offset (what Polygon.bounds gives). Only
+        # pairs whose boxes meet are tested, as STRtree would, with the
+        # predicates vectorized over all of them at once; these small fixed
+        # grids are probed by bisection and often have no overlap at all.
+        # Preparing the polygons costs more than the few tests each one sees.
+        scale = self.config.collision_scale
+        stack, lo, hi = _grid_outlines(angles, float(scale))
+        ox = xs * scale
+        oy = ys * scale
+        x0 = lo[:, 0] + ox
+        y0 = lo[:, 1] + oy
+        x1 = hi[:, 0] + ox
+        y1 = hi[:, 1] + oy
+        meets = (
+            (x0[:, None] <= x1[None, :])
+            & (x0[None, :] <= x1[:, None])
+            & (y0[:, None] <= y1[None, :])
+            & (y0[None, :] <= y1[:, None])
+        )
+        pairs_i, pairs_j = np.nonzero(np.triu(meets, k=1))
+        if pairs_i.size == 0:
+            return False
+
+        polys = build_tree_polygons(stack, xs, ys, scale)
+        first = polys[pairs_i]
+        second = polys[pairs_j]
+        hit = shapely.intersects(first, second)
+        if not hit.any():
+            return False
+        return bool((~shapely.touches(first[hit], second[hit])).any())
 
     def _pair_collision(
         self,
@@ -66,54 +137,87 @@ class RowPatternSolver:
         offset_b: float,
         angle_b: float,
     ) -> bool:
-        polys = []
         cols = self.config.grid_size
-        for r in range(2):
-            offset = offset_a if r == 0 else offset_b
-            angle = angle_a if r == 0 else angle_b
-            y = r * dy
-            for c in range(cols):
-                x = c * dx + offset
-                polys.append(build_tree_polygon(x, y, angle, self.config.collision_scale))
-        tree = STRtree(polys)
-        for i, poly in enumerate(polys):
-            for idx in tree.query(poly):
-                if idx == i:
-                    continue
-                if _overlaps(poly, polys[idx]):
-                    return True
-        return False
+        r, c = np.divmod(np.arange(2 * cols), cols)
+        xs = c * dx + np.where(r == 0, offset_a, offset_b)
+        ys = r * dy
+        angles = (float(angle_a),) * cols + (float(angle_b),) * cols
+        return self._any_overlap(xs, ys, angles)
+
+    def _cross_row_collision(
+        self,
+        dx: float,
+        dy: float,
+        offset_a: float,
+        angle_a: float,
+        offset_b: float,
+        angle_b: float,
+    ) -> bool:
+        # The part of _pair_collision that depends on dy: whether the upper
+        # row meets the lower one. Column pairs with the same shift are
+        # translates of each other, so only the pairs through column 0 of
+        # either row are tested, placed exactly as in the full grid.
+        scale = self.config.collision_scale
+        stack, lo, hi = _grid_outlines((float(angle_a), float(angle_b)), float(scale))
+        cols = self.config.grid_size
+        c = np.arange(cols)
+        lower = np.concatenate((np.zeros(cols, dtype=c.dtype), c[1:]))
+        upper = np.concatenate((c, np.zeros(cols - 1, dtype=c.dtype)))
+        xs_a = (c * dx + offset_a)[lower]
+        xs_b = (c * dx + offset_b)[upper]
+        ox_a = xs_a * scale
+        ox_b = xs_b * scale
+        oy_b = dy * scale
+        meets = (
+            (lo[0, 0] + ox_a <= hi[1, 0] + ox_b)
+            & (lo[1, 0] + ox_b <= hi[0, 0] + ox_a)
+            & (lo[0, 1] <= hi[1, 1] + oy_b)
+            & (lo[1, 1] + oy_b <= hi[0, 1])
+        )
+        if not meets.any():
+            return False
+        count = int(meets.sum())
+        first = build_tree_polygons(
+            np.broadcast_to(stack[0], (count,) + stack.shape[1:]),
+            xs_a[meets],
+            np.zeros(count),
+            scale,
+        )
+        second = build_tree_polygons(
+            np.broadcast_to(stack[1], (count,) + stack.shape[1:]),
+            xs_b[meets],
+            np.full(count, dy),
+            scale,
+        )
+        hit = shapely.intersects(first, second)
+        if not hit.any():
+            return False
+        return bool((~shapely.touches(first[hit], second[hit])).any())
 
     def _grid_collision(self, spec: RowPatternSpec) -> bool:
-        polys = []
         rows = self.config.grid_size
         cols = self.config.grid_size
         period = len(spec.angles)
-        for r in range(rows):
-            row_idx = r % period
-            angle = spec.angles[row_idx]
-            offset = spec.offsets[row_idx] * spec.dx
-            y = r * spec.dy
-            for c in range(cols):
-                x = c * spec.dx + offset
-                polys.append(build_tree_polygon(x, y, angle, self.config.collision_scale))
-        tree = STRtree(polys)
-        for i, poly in enumerate(polys):
-            for idx in tree.query(poly):
-                if idx == i:
-                    continue
-                if _overlaps(poly, polys[idx]):
-                    return True
-        return False
+        r, c = np.divmod(np.arange(rows * cols), cols)
+        row_idx = r % period
+        offsets = np.array([o * spec.dx for o in spec.offsets])
+        xs = c * spec.dx + offsets[row_idx]
+        ys = r * spec.dy
+        angles = tuple(float(spec.angles[i]) for i in row_idx.tolist())
+        return self._any_overlap(xs, ys, angles)
 
     def min_dx_for_angle(self, angle: float, dx_min: float, dx_max: float) -> float | None:
-        if self._row_collision(angle, dx_max):
+        # The left tree stays at the origin; only its neighbour moves.
+        base = build_tree_polygon(0.0, 0.0, angle, self.config.collision_scale)
+        if self._row_collision(base, angle, dx_max):
             return None
         lo = dx_min
         hi = dx_max
         for _ in range(40):
+            if hi - lo <= self.config.bisect_tol:
+                break
             mid = (lo + hi) / 2.0
-            if self._row_collision(angle, mid):
+            if self._row_collision(base, angle, mid):
                 lo = mid
             else:
                 hi = mid
@@ -131,109 +235,64 @@ class RowPatternSolver:
     ) -> float | None:
         if self._pair_collision(dx, dy_max, offset_a, angle_a, offset_b, angle_b):
             return None
+        # That check also cleared each row on its own, which does not change
+        # with dy, so the bisection only needs the two rows against each other.
         lo = dy_min
         hi = dy_max
         for _ in range(40):
+            if hi - lo <= self.config.bisect_tol:
+                break
             mid = (lo + hi) / 2.0
-            if self._pair_collision(dx, mid, offset_a, angle_a, offset_b, angle_b):
+            if self._cross_row_collision(dx, mid, offset_a, angle_a, offset_b, angle_b):
                 lo = mid
             else:
                 hi = mid
         return hi
 
-    def _tile_points(self, n: int, spec: RowPatternSpec) -> List[TreePlacement]:
+    def _tile_points(
+        self, n: int, spec: RowPatternSpec
+    ) -> Tuple[np.ndarray, np.ndarray, List[float], np.ndarray]:
+        # Grid trees row by row as flat x/y arrays, with their angles and
+        # (N, 4) outline boxes. Every tree in row j shares that row's angle
+        # and offset, so only the rows are handled in Python.
         dx = spec.dx
         dy = spec.dy
         period = len(spec.angles)
         side_cells = int(math.ceil(math.sqrt(max(1, n)))) + self.config.search_pad
-        placements: List[TreePlacement] = []
-        for j in range(-side_cells, side_cells + 1):
-            angle = spec.angles[j % period]
-            offset = spec.offsets[j % period] * dx
-            for i in range(-side_cells, side_cells + 1):
-                x = i * dx + offset
-                y = j * dy
-                placements.append(TreePlacement(x=x, y=y, deg=angle))
-        return placements
+        width = 2 * side_cells + 1
+        phases = [j % period for j in range(-side_cells, side_cells + 1)]
+        cells = np.arange(-side_cells, side_cells + 1, dtype=np.float64)
+        row_offsets = np.array([spec.offsets[k] * dx for k in phases], dtype=np.float64)
+        xs = (cells[None, :] * dx + row_offsets[:, None]).ravel()
+        ys = np.repeat(cells * dy, width)
+        degs = [spec.angles[k] for k in phases for _ in range(width)]
+        # _angle_id may grow the table, so resolve the ids before indexing it.
+        row_ids = [self._angle_id(spec.angles[k]) for k in phases]
+        return xs, ys, degs, np.repeat(self._angle_lut[row_ids], width, axis=0)
 
     def _score_and_bounds(
         self, placements: List[TreePlacement]
     ) -> Tuple[float, Tuple[float, float, float, float]]:
-        minx = miny = float("inf")
-        maxx = maxy = float("-inf")
-        for p in placements:
-            bx0, by0, bx1, by1 = self._bounds_for_angle(p.deg)
-            minx = min(minx, p.x + bx0)
-            miny = min(miny, p.y + by0)
-            maxx = max(maxx, p.x + bx1)
-            maxy = max(maxy, p.y + by1)
-        side = max(maxx - minx, maxy - miny)
-        score = (side * side) / len(placements)
-        return score, (minx, miny, maxx, maxy)
-
-    def _center(
-        self, placements: List[TreePlacement], bounds: Tuple[float, float, float, float]
-    ) -> List[TreePlacement]:
-        minx, miny, maxx, maxy = bounds
-        cx = (minx + maxx) / 2.0
-        cy = (miny + maxy) / 2.0
-        return [TreePlacement(x=p.x - cx, y=p.y - cy, deg=p.deg) for p in placements]
-
-    def _square_search(self, placements: List[TreePlacement], n: int, dx: float, dy: float) -> List[TreePlacement]:
-        steps = max(1, int(self.config.center_steps))
-        offsets_x = [dx * (i / steps) for i in range(steps)]
-        offsets_y = [dy * (i / steps) for i in range(steps)]
-
-        best_layout: List[TreePlacement] = []
-        best_score = float("inf")
-
-        for cx in offsets_x:
-            for cy in offsets_y:
-                ranked: List[Tuple[float, TreePlacement]] = []
-                for p in placements:
-                    bx0, by0, bx1, by1 = self._bounds_for_angle(p.deg)
-                    hx = max(abs(p.x + bx0 - cx), abs(p.x + bx1 - cx))
-                    hy = max(abs(p.y + by0 - cy), abs(p.y + by1 - cy))
-                    ranked.append((max(hx, hy), p))
-                ranked.sort(key=lambda t: t[0])
-                chosen = [p for _, p in ranked[:n]]
-                score, _ = self._score_and_bounds(chosen)
-                if score < best_score:
-                    best_score = score
-                    best_layout = chosen
-
-        return best_layout
-
-    def _scale(self, placements: List[TreePlacement], factor: float) -> List[TreePlacement]:
-        return [TreePlacement(x=p.x * factor, y=p.y * factor, deg=p.deg) for p in placements]
-
-    def _has_collision(self, placements: List[TreePlacement]) -> bool:
-        polys = [
-            build_tree_polygon(p.x, p.y, p.deg, self.config.collision_scale)
-            for p in placements
-        ]
-        tree = STRtree(polys)
-        for i, poly in enumerate(polys):
-            for idx in tree.query(poly):
-                if idx == i:
-                    continue
-                if _overlaps(poly, polys[idx]):
-                    return True
-        return False
-
-    def _global_squeeze(self, placements: List[TreePlacement]) -> List[TreePlacement]:
+        count = len(placements)
+        xs = np.fromiter((p.x for p in placements), dtype=np.float64, count=count)
+        ys = np.fromiter((p.y for p in placements), dtype=np.float64, count=count)
+        return score_and_bounds(xs, ys, self._angle_boxes(placements))
+
+    def _global_squeeze(
+        self, xs: np.ndarray, ys: np.ndarray, degs: List[float]
+    ) -> Tuple[np.ndarray, np.ndarray]:
         if not self.config.global_squeeze:
-            return placements
+            return xs, ys
         factor = self.config.squeeze_factor
         current_scale = 1.0
-        current = placements
+        current = (xs, ys)
         low = None
         high = 1.0
 
         for _ in range(self.config.squeeze_steps):
             next_scale = current_scale * factor
-            scaled = self._scale(placements, next_scale)
-            if self._has_collision(scaled):
+            scaled = (xs * next_scale, ys * next_scale)
+            if has_collision(*scaled, degs, self.config.collision_scale):
                 low = next_scale
                 high = current_scale
                 break
@@ -245,29 +304,72 @@ class RowPatternSolver:
 
         for _ in range(self.config.squeeze_iters):
             mid = (low + high) / 2.0
-            scaled = self._scale(placements, mid)
-            if self._has_collision(scaled):
+            if has_collision(xs * mid, ys * mid, degs, self.config.collision_scale):
                 low = mid
             else:
                 high = mid
-        return self._scale(placements, high)
-
-    def best_layout(self, n: int, spec: RowPatternSpec) -> List[TreePlacement]:
-        placements = self._tile_points(n, spec)
+        return xs * high, ys * high
+
+    def _select_layout(
+        self, n: int, spec: RowPatternSpec
+    ) -> Tuple[np.ndarray, np.ndarray, List[float], float, Tuple[float, float, float, float]]:
+        # Selection and squeeze run on x/y arrays; TreePlacement objects are
+        # only built by best_layout.
+        xs, ys, degs, boxes = self._tile_points(n, spec)
+        bounds = None
         if self.config.selection_mode == "square_search":
-            best = self._square_search(placements, n, spec.dx, spec.dy)
+            extents = boxes + np.column_stack((xs, ys, xs, ys))
+            order, bounds = square_search(extents, n, spec.dx, spec.dy, self.config.center_steps)
         else:
-            def key(p: TreePlacement) -> Tuple[float, float]:
-                return (max(abs(p.x), abs(p.y)), abs(p.x) + abs(p.y))
+            ax = np.abs(xs)
+            ay = np.abs(ys)
+            # Stable, like sorted() on the (Chebyshev, Manhattan) key.
+            order = np.lexsort((ax + ay, np.maximum(ax, ay)))[:n]
+        degs = [degs[i] for i in order.tolist()]
+
+        selected_xs = xs[order]
+        xs, ys = self._global_squeeze(selected_xs, ys[order], degs)
+        if bounds is None or xs is not selected_xs:
+            # A squeeze moves the trees, so the search bounds no longer hold.
+            score, bounds = score_and_bounds(xs, ys, boxes[order])
+        else:
+            minx, miny, maxx, maxy = bounds
+            side = max(maxx - minx, maxy - miny)
+            score = (side * side) / xs.size
+        return xs, ys, degs, score, bounds
 
-            best = sorted(placements, key=key)[:n]
+    def best_layout(self, n: int, spec: RowPatternSpec) -> List[TreePlacement]:
+        xs, ys, degs, _, (minx, miny, maxx, maxy) = self._select_layout(n, spec)
+        cx = (minx + maxx) / 2.0
+        cy = (miny + maxy) / 2.0
+        return [
+            TreePlacement(x=x, y=y, deg=deg)
+            for x, y, deg in zip((xs - cx).tolist(), (ys - cy).tolist(), degs)
+        ]
+
+    def score_spec(self, spec: RowPatternSpec, n_list: Iterable[int]) -> float:
+        # Centering does not change the score, so skip it for proxy scoring.
+        return sum(self._select_layout(n, spec)[3] for n in n_list)
 
-        best = self._global_squeeze(best)
-        _, bounds = self._score_and_bounds(best)
-        return self._center(best, bounds)
+    def score_if_valid(self, spec: RowPatternSpec, n_list: Iterable[int]) -> Optional[float]:
+        if self._grid_collision(spec):
+            return None
+        return self.score_spec(spec, n_list)
 
     def solve(self, n_max: int, spec: RowPatternSpec) -> dict[int, List[TreePlacement]]:
-        groups: dict[int, List[TreePlacement]] = {}
-        for n in range(1, n_max + 1):
-            groups[n] = self.best_layout(n, spec)
-        return groups
+        workers = min(self.config.max_workers or os.cpu_count() or 1, n_max)
+        if workers <= 1:
+            return {n: self.best_layout(n, spec) for n in range(1, n_max + 1)}
+        # Interleaved shares give every worker some of the large, slow n.
+        tasks = [(self.config, spec, list(range(1 + i, n_max + 1, workers))) for i in range(workers)]
+        with ProcessPoolExecutor(max_workers=workers) as executor:
+            solved = dict(pair for part in executor.map(_solve_share, tasks) for pair in part)
+        return {n: solved[n] for n in range(1, n_max + 1)}
+
+
+def _solve_share(
+    task: Tuple[RowPatternConfig, RowPatternSpec, List[int]],
+) -> List[Tuple[int, List[TreePlacement]]]:
+    config, spec, ns = task
+    solver = RowPatternSolver(config)
+    return [(n, solver.best_layout(n, spec)) for n in ns]
@@ -1,13 +1,16 @@
+import math
+import numpy as np
 import pandas as pd
-from decimal import Decimal, getcontext
-from shapely import affinity
-from shapely.geometry import Polygon
 import time, random
 import multiprocessing as mp
 
+try:
+    from numba import njit
+    NUMBA_AVAILABLE = True
+except ImportError:
+    NUMBA_AVAILABLE = False
+
 # --- Global settings ---
-getcontext().prec = 50
-scale_factor = Decimal('1e18')
 scale_factor_float = 1e18
 
 # ====== Hyperparameters: more aggressive = larger ======
@@ -27,81 +30,171 @@ RANDOM_SEED = 42
 PROCESSES = max(1, mp.cpu_count() - 2)  # Leave some CPU for the OS
 CHUNKSIZE = 8                           # map chunk size; tune per machine
 
+# Tree outline (tip, tiers, trunk), pre-scaled once
+_TREE_COORDS = np.array([
+    (0.0, 0.8),
+    (0.125, 0.5), (0.0625, 0.5),
+    (0.2, 0.25), (0.1, 0.25),
+    (0.35, 0.0), (0.075, 0.0),
+    (0.075, -0.2), (-0.075, -0.2),
+    (-0.075, 0.0), (-0.35, 0.0),
+    (-0.1, 0.25), (-0.2, 0.25),
+    (-0.0625, 0.5), (-0.125, 0.5),
+]) * scale_factor_float
+_TREE_X = _TREE_COORDS[:, 0].copy()
+_TREE_Y = _TREE_COORDS[:, 1].copy()
+
 
 # --- Core class definition ---
 class ChristmasTree:
+    # Only the bounds are used here, so the outline is rotated and moved as
+    # plain float arrays, the same arithmetic shapely.affinity applies. The
+    # centre and angle stay as the input strings for saving back.
     def __init__(self, center_x='0', center_y='0', angle='0'):
-        self.center_x = Decimal(center_x)
-        self.center_y = Decimal(center_y)
-        self.angle = Decimal(angle)
-        self.polygon = self._create_polygon()
-        self.bounds = self.polygon.bounds  # (minx, miny, maxx, maxy)
-
-    def _create_polygon(self):
-        trunk_w = Decimal('0.15'); trunk_h = Decimal('0.2')
-        base_w = Decimal('0.7'); base_y = Decimal('0.0')
-        mid_w  = Decimal('0.4'); tier_2_y = Decimal('0.25')
-        top_w  = Decimal('0.25'); tier_1_y = Decimal('0.5')
-        tip_y  = Decimal('0.8'); trunk_bottom_y = -trunk_h
-
-        coords = [
-            (Decimal('0.0'), tip_y),
-            (top_w / 2, tier_1_y), (top_w / 4, tier_1_y),
-            (mid_w / 2, tier_2_y), (mid_w / 4, tier_2_y),
-            (base_w / 2, base_y), (trunk_w / 2, base_y),
-            (trunk_w / 2, trunk_bottom_y), (-(trunk_w / 2), trunk_bottom_y),
-            (-(trunk_w / 2), base_y), (-(base_w / 2), base_y),
-            (-(mid_w / 4), tier_2_y), (-(mid_w / 2), tier_2_y),
-            (-(top_w / 4), tier_1_y), (-(top_w / 2), tier_1_y),
-        ]
-
-        scaled_coords = [(float(x) * scale_factor_float, float(y) * scale_factor_float) for x, y in coords]
-        initial_polygon = Polygon(scaled_coords)
-
-        rotated = affinity.rotate(initial_polygon, float(self.angle), origin=(0, 0))
-        return affinity.translate(
-            rotated,
-            xoff=float(self.center_x) * scale_factor_float,
-            yoff=float(self.center_y) * scale_factor_float
-        )
+        self.center_x = str(center_x)
+        self.center_y = str(center_y)
+        self.angle = str(angle)
+        self.bounds = self._create_bounds()  # (minx, miny, maxx, maxy)
+
+    def _create_bounds(self):
+        angle = float(self.angle) * math.pi / 180.0
+        c = math.cos(angle)
+        s = math.sin(angle)
+        if abs(c) < 2.5e-16:
+            c = 0.0
+        if abs(s) < 2.5e-16:
+            s = 0.0
+        xs = c * _TREE_X - s * _TREE_Y + float(self.center_x) * scale_factor_float
+        ys = s * _TREE_X + c * _TREE_Y + float(self.center_y) * scale_factor_float
+        return (float(xs.min()), float(ys.min()), float(xs.max()), float(ys.max()))
 
     def clone(self) -> "ChristmasTree":
         new_tree = ChristmasTree.__new__(ChristmasTree)
         new_tree.center_x = self.center_x
         new_tree.center_y = self.center_y
         new_tree.angle = self.angle
-        new_tree.polygon = self.polygon
         new_tree.bounds = self.bounds
         return new_tree
 
 
 # --- Bounds utilities ---
+# A group's bounds are an (n, 4) float array of (minx, miny, maxx, maxy) rows.
 def get_bounds_side(bounds_list):
-    if not bounds_list:
+    if len(bounds_list) == 0:
         return 0.0
-    min_x = min(b[0] for b in bounds_list)
-    min_y = min(b[1] for b in bounds_list)
-    max_x = max(b[2] for b in bounds_list)
-    max_y = max(b[3] for b in bounds_list)
-    return max(max_x - min_x, max_y - min_y) / scale_factor_float
-
-def compute_touching_candidates(bounds_list, eps=BOUND_EPS):
-    n = len(bounds_list)
-    if n == 0:
-        return []
-    min_x = min(b[0] for b in bounds_list)
-    min_y = min(b[1] for b in bounds_list)
-    max_x = max(b[2] for b in bounds_list)
-    max_y = max(b[3] for b in bounds_list)
-    cand = []
-    for i, b in enumerate(bounds_list):
-        if (abs(b[0] - min_x) < eps or abs(b[1] - min_y) < eps or
-            abs(b[2] - max_x) < eps or abs(b[3] - max_y) < eps):
-            cand.append(i)
+    lo = bounds_list[:, :2].min(axis=0)
+    hi = bounds_list[:, 2:].max(axis=0)
+    return float(max(hi[0] - lo[0], hi[1] - lo[1])) / scale_factor_float
+
+def compute_touching_candidates(bounds_list, eps=BOUND_EPS, alive=None, extremes=None):
+    # With an alive mask, only those rows count and the indices stay the
+    # full array's, in the same ascending order. Beam states pass their
+    # live_extremes so the live rows are not gathered twice.
+    if alive is None:
+        alive = np.ones(len(bounds_list), dtype=bool)
+    if extremes is not None:
+        lo = np.array((extremes[0], extremes[2]))
+        hi = np.array((extremes[4], extremes[6]))
+    else:
+        live = bounds_list[alive]
+        if len(live) == 0:
+            return []
+        lo = live[:, :2].min(axis=0)
+        hi = live[:, 2:].max(axis=0)
+    touching = alive & (
+        (np.abs(bounds_list[:, :2] - lo) < eps).any(axis=1)
+        | (np.abs(bounds_list[:, 2:] - hi) < eps).any(axis=1)
+    )
+    cand = np.flatnonzero(touching).tolist()
     if not cand:
-        cand = list(range(n))
+        cand = np.flatnonzero(alive).tolist()
     return cand
 
+def live_extremes(bounds_list, alive):
+    """Two lowest minx/miny and two highest maxx/maxy among >= 2 live trees."""
+    live = bounds_list[alive]
+    low = np.partition(live[:, :2], 1, axis=0)[:2].tolist()
+    high = (-np.partition(-live[:, 2:], 1, axis=0)[:2]).tolist()
+    return (low[0][0], low[1][0], low[0][1], low[1][1],
+            high[0][0], high[1][0], high[0][1], high[1][1])
+
+def _scan_state_loop(bounds_list, alive, eps):
+    # live_extremes and compute_touching_candidates in one pass over the
+    # rows, for the JIT. On ties the runner-up takes the same value, as in
+    # the partition above.
+    n = bounds_list.shape[0]
+    min_x = min_x2 = min_y = min_y2 = np.inf
+    max_x = max_x2 = max_y = max_y2 = -np.inf
+    for i in range(n):
+        if not alive[i]:
+            continue
+        v = bounds_list[i, 0]
+        if v < min_x:
+            min_x2 = min_x
+            min_x = v
+        elif v < min_x2:
+            min_x2 = v
+        v = bounds_list[i, 1]
+        if v < min_y:
+            min_y2 = min_y
+            min_y = v
+        elif v < min_y2:
+            min_y2 = v
+        v = bounds_list[i, 2]
+        if v > max_x:
+            max_x2 = max_x
+            max_x = v
+        elif v > max_x2:
+            max_x2 = v
+        v = bounds_list[i, 3]
+        if v > max_y:
+            max_y2 = max_y
+            max_y = v
+        elif v > max_y2:
+            max_y2 = v
+    cand = np.empty(n, dtype=np.int64)
+    k = 0
+    for i in range(n):
+        if alive[i] and (abs(bounds_list[i, 0] - min_x) < eps or abs(bounds_list[i, 1] - min_y) < eps
+                         or abs(bounds_list[i, 2] - max_x) < eps or abs(bounds_list[i, 3] - max_y) < eps):
+            cand[k] = i
+            k += 1
+    if k == 0:
+        for i in range(n):
+            if alive[i]:
+                cand[k] = i
+                k += 1
+    return cand[:k], (min_x, min_x2, min_y, min_y2, max_x, max_x2, max_y, max_y2)
+
+if NUMBA_AVAILABLE:
+    _scan_state_jit = njit(cache=True)(_scan_state_loop)
+
+    def scan_state(bounds_list, alive, eps=BOUND_EPS):
+        """Touching candidates and live_extremes of a beam state (>= 2 live trees)."""
+        cand, extremes = _scan_state_jit(bounds_list, alive, eps)
+        return cand.tolist(), extremes
+
+else:
+
+    def scan_state(bounds_list, alive, eps=BOUND_EPS):
+        """Touching candidates and live_extremes of a beam state (>= 2 live trees)."""
+        extremes = live_extremes(bounds_list, alive)
+        return compute_touching_candidates(bounds_list, eps, alive, extremes), extremes
+
+def side_without(row, extremes):
+    # Dropping one tree can only move an extreme it holds to the runner-up
+    # (equal to it on ties), so the reduced side needs no scan.
+    min_x, min_x2, min_y, min_y2, max_x, max_x2, max_y, max_y2 = extremes
+    if row[0] == min_x:
+        min_x = min_x2
+    if row[1] == min_y:
+        min_y = min_y2
+    if row[2] == max_x:
+        max_x = max_x2
+    if row[3] == max_y:
+        max_y = max_y2
+    return max(max_x - min_x, max_y - min_y) / scale_factor_float
+
 
 def choose_removal_beam_lookahead(bounds_list, depth, beam, max_states, rand_tries, rand_k, seed):
     """
@@ -113,8 +206,20 @@ def choose_removal_beam_lookahead(bounds_list, depth, beam, max_states, rand_tri
     if n0 <= 1:
         return None, 0.0
 
+    # Beam states never copy the bounds: each keeps an alive mask over the
+    # full array, and candidates are scored from the parent's extremes.
+    # Only states kept in the beam get a mask of their own.
+    rows = bounds_list.tolist()
+    all_alive = np.ones(n0, dtype=bool)
+
+    def settle(state):
+        score, parent_alive, removed, count, first_idx, first_s1 = state
+        alive = parent_alive.copy()
+        alive[removed] = False
+        return (score, alive, count, first_idx, first_s1)
+
     def run_once(shuffle=True, limit_k=rand_k):
-        base_cands = compute_touching_candidates(bounds_list)
+        base_cands, extremes = scan_state(bounds_list, all_alive)
         if shuffle:
             rng.shuffle(base_cands)
         if limit_k and len(base_cands) > limit_k:
@@ -123,44 +228,42 @@ def choose_removal_beam_lookahead(bounds_list, depth, beam, max_states, rand_tri
         # First layer
         first_layer = []
         for idx in base_cands:
-            reduced = bounds_list[:idx] + bounds_list[idx+1:]
-            s1 = get_bounds_side(reduced)
-            # (score_now, reduced_bounds, first_idx, first_s1)
-            first_layer.append((s1, reduced, idx, s1))
+            s1 = side_without(rows[idx], extremes)
+            # (score_now, parent_alive, removed_idx, trees_left, first_idx, first_s1)
+            first_layer.append((s1, all_alive, idx, n0 - 1, idx, s1))
 
         if not first_layer:
             return None, float("inf")
 
         first_layer.sort(key=lambda x: x[0])
-        frontier = first_layer[:min(beam, len(first_layer))]
+        frontier = [settle(st) for st in first_layer[:min(beam, len(first_layer))]]
 
         # best_key: (future_best, first_s1)
-        best_key = (frontier[0][0], frontier[0][3])
-        best_first = frontier[0][2]
-        best_s1 = frontier[0][3]
+        best_key = (frontier[0][0], frontier[0][4])
+        best_first = frontier[0][3]
+        best_s1 = frontier[0][4]
 
         states_used = len(frontier)
 
         # Expand to depth
         for _d in range(2, max(2, depth + 1)):
             new_frontier = []
-            for score_now, bds, first_idx, first_s1 in frontier:
-                if len(bds) <= 1:
+            for score_now, alive, count, first_idx, first_s1 in frontier:
+                if count <= 1:
                     key = (0.0, first_s1)
                     if key < best_key:
                         best_key, best_first, best_s1 = key, first_idx, first_s1
                     continue
 
-                cands = compute_touching_candidates(bds)
+                cands, extremes = scan_state(bounds_list, alive)
                 if shuffle:
                     rng.shuffle(cands)
                 if limit_k and len(cands) > limit_k:
                     cands = cands[:limit_k]
 
                 for j in cands:
-                    nb = bds[:j] + bds[j+1:]
-                    s = get_bounds_side(nb)
-                    new_frontier.append((s, nb, first_idx, first_s1))
+                    s = side_without(rows[j], extremes)
+                    new_frontier.append((s, alive, j, count - 1, first_idx, first_s1))
                     states_used += 1
                     if states_used >= max_states:
                         break
@@ -171,12 +274,12 @@ def choose_removal_beam_lookahead(bounds_list, depth, beam, max_states, rand_tri
                 break
 
             new_frontier.sort(key=lambda x: x[0])
-            frontier = new_frontier[:min(beam, len(new_frontier))]
+            frontier = [settle(st) for st in new_frontier[:min(beam, len(new_frontier))]]
 
             cur_best = frontier[0]
-            key = (cur_best[0], cur_best[3])
+            key = (cur_best[0], cur_best[4])
             if key < best_key:
-                best_key, best_first, best_s1 = key, cur_best[2], cur_best[3]
+                best_key, best_first, best_s1 = key, cur_best[3], cur_best[4]
 
             if states_used >= max_states:
                 break
@@ -251,7 +354,7 @@ def parse_csv(csv_path):
             trees.append(ChristmasTree(center_x=row['x'], center_y=row['y'], angle=row['deg']))
         gid = f"{int(group_id):03d}"
         dict_of_tree_list[gid] = trees
-        dict_of_side_length[gid] = get_bounds_side([t.bounds for t in trees])
+        dict_of_side_length[gid] = get_bounds_side(np.array([t.bounds for t in trees]))
 
     return dict_of_tree_list, dict_of_side_length
 
@@ -310,7 +413,7 @@ def main():
                 gidPrev = f"{N-1:03d}"
                 if gidN not in snap_tree_list or gidPrev not in snap_side:
                     continue
-                bounds_list = [t.bounds for t in snap_tree_list[gidN]]
+                bounds_list = np.array([t.bounds for t in snap_tree_list[gidN]])
                 prev_best = snap_side[gidPrev]
                 tasks.append((N, bounds_list, prev_best, DEPTH, BEAM, MAX_STATES, RAND_TRIES, RAND_K, base_seed))
 